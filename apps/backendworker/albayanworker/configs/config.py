@@ -17,22 +17,73 @@ class Config:
     # LibreOffice Configurations
     libreoffice_host: str
     libreoffice_port: int
+    # Comma separated host:port list of soffice instances serving this worker
+    libreoffice_instances: list[str]
+    # Number of concurrent renders an instance accepts before spilling over
+    libreoffice_instance_concurrency: int
+    # Byte budget of the imported graphics cached per soffice instance
+    graphic_cache_max_bytes: int
+    # Render Admission Configurations
+    admission_min_limit: int
+    admission_max_limit: int
+    admission_latency_tolerance: float
+    # Fair Share Scheduling Configurations
+    fair_share_interactive_weight: float
+    fair_share_bulk_weight: float
+    fair_share_tenant_weights: dict[str, float]
+    fair_share_tenant_quota: int
+    fair_share_interactive_reserve: int
+    fair_share_max_queue: int
+    fair_share_queue_timeout: float
+    # UNO Call Tracing Configurations
+    uno_trace_sample_rate: float
+    uno_trace_folder: str
+    # Prefork Configurations
+    worker_processes: int
+    shared_cache_folder: str
+    # Seconds report definitions stay in the shared cache, 0 disables the cache
+    definition_cache_ttl: float
+    # Lifecycle Configurations
+    prewarm_template_ids: list[str]
+    shutdown_drain_timeout: float
     # Folders
     templates_folder: str
     output_folder: str
-    temp_folder: str
 
     def create_directories_if_not_exists(self):
         """Creates a directory if it does not exist."""
         for path in [
             self.templates_folder,
             self.output_folder,
-            self.temp_folder,
         ]:
             Path(path).mkdir(parents=True, exist_ok=True)
 
+    @staticmethod
+    def parse_libreoffice_instances(
+        instances: str, libreoffice_host: str, libreoffice_port: int
+    ) -> list[str]:
+        """Parses the soffice instances list, defaulting to the single host and port."""
+        parsed_instances = [
+            instance.strip().lower()
+            for instance in instances.split(",")
+            if instance.strip()
+        ]
+        return parsed_instances or [f"{libreoffice_host}:{libreoffice_port}"]
+
+    @staticmethod
+    def parse_tenant_weights(tenant_weights: str) -> dict[str, float]:
+        """Parses "tenant=weight" pairs separated by commas."""
+        parsed_weights = {}
+        for pair in tenant_weights.split(","):
+            if "=" in pair:
+                tenant_id, weight = pair.split("=", 1)
+                parsed_weights[tenant_id.strip()] = float(weight)
+        return parsed_weights
+
     @staticmethod
     def from_env():
+        libreoffice_host = os.getenv("LIBREOFFICE_HOST", "localhost").lower()
+        libreoffice_port = int(os.getenv("LIBREOFFICE_PORT", "2002"))
         return Config(
             environment=os.getenv("ENVIRONMENT", "DEVELOPMENT").upper(),
             aws_region=os.getenv("AWS_REGION", "us-east-1"),
@@ -41,11 +92,56 @@ class Config:
             dynamodb_endpoint=os.getenv("DYNAMODB_ENDPOINT", "http://localhost:8000"),
             definition_table=os.getenv("DEFINITION_TABLE_NAME", "reports_definition"),
             processing_table=os.getenv("PROCESSING_TABLE_NAME", "reports_processing"),
-            libreoffice_host=os.getenv("LIBREOFFICE_HOST", "localhost").lower(),
-            libreoffice_port=int(os.getenv("LIBREOFFICE_PORT", "2002")),
+            libreoffice_host=libreoffice_host,
+            libreoffice_port=libreoffice_port,
+            libreoffice_instances=Config.parse_libreoffice_instances(
+                os.getenv("LIBREOFFICE_INSTANCES", ""),
+                libreoffice_host,
+                libreoffice_port,
+            ),
+            libreoffice_instance_concurrency=int(
+                os.getenv("LIBREOFFICE_INSTANCE_CONCURRENCY", "1")
+            ),
+            graphic_cache_max_bytes=int(
+                os.getenv("GRAPHIC_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+            ),
+            admission_min_limit=int(os.getenv("ADMISSION_MIN_LIMIT", "1")),
+            admission_max_limit=int(os.getenv("ADMISSION_MAX_LIMIT", "64")),
+            admission_latency_tolerance=float(
+                os.getenv("ADMISSION_LATENCY_TOLERANCE", "2.0")
+            ),
+            fair_share_interactive_weight=float(
+                os.getenv("FAIR_SHARE_INTERACTIVE_WEIGHT", "8")
+            ),
+            fair_share_bulk_weight=float(os.getenv("FAIR_SHARE_BULK_WEIGHT", "1")),
+            fair_share_tenant_weights=Config.parse_tenant_weights(
+                os.getenv("FAIR_SHARE_TENANT_WEIGHTS", "")
+            ),
+            fair_share_tenant_quota=int(os.getenv("FAIR_SHARE_TENANT_QUOTA", "0")),
+            fair_share_interactive_reserve=int(
+                os.getenv("FAIR_SHARE_INTERACTIVE_RESERVE", "1")
+            ),
+            fair_share_max_queue=int(os.getenv("FAIR_SHARE_MAX_QUEUE", "10000")),
+            fair_share_queue_timeout=float(
+                os.getenv("FAIR_SHARE_QUEUE_TIMEOUT", "30")
+            ),
+            uno_trace_sample_rate=float(os.getenv("UNO_TRACE_SAMPLE_RATE", "0")),
+            uno_trace_folder=os.getenv(
+                "UNO_TRACE_FOLDER", "/tmp/albayanworker_uno_traces"
+            ),
+            worker_processes=int(os.getenv("WORKER_PROCESSES", "1")),
+            shared_cache_folder=os.getenv(
+                "SHARED_CACHE_FOLDER", "/tmp/albayanworker_shared_cache"
+            ),
+            definition_cache_ttl=float(os.getenv("DEFINITION_CACHE_TTL", "0")),
+            prewarm_template_ids=[
+                template_id.strip()
+                for template_id in os.getenv("PREWARM_TEMPLATE_IDS", "").split(",")
+                if template_id.strip()
+            ],
+            shutdown_drain_timeout=float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", "30")),
             templates_folder=os.getenv("TEMPLATES_FOLDER", "/tmp/input"),
             output_folder=os.getenv("OUTPUT_FOLDER", "/tmp/output"),
-            temp_folder=os.getenv("TEMP_FOLDER", "/tmp/albayanworker_temp"),
         )
 
 
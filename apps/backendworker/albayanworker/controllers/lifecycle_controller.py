@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import signal
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
+from uuid import UUID
+from albayanworker.configs.config import config
+from albayanworker.controllers.dynamodb_controlller import DynamodbController
+from albayanworker.controllers.report_creation import get_report_template
+from albayanworker.dependancies.dyanomodb import (
+    close_dynamodb_resource,
+    get_dynamodb_table,
+)
+from albayanworker.dependancies.libreoffice import (
+    acquire_libreoffice,
+    initialize_libreoffice_instances,
+)
+from albayanworker.schemas.document_schemas import ProcessingStatus
+from albayanworker.schemas.lifecycle_schemas import WorkerStatus
+from albayanworker.utilities import libreoffice_utilites
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerLifecycle:
+    """Tracks the worker status and the report jobs currently in flight."""
+
+    def __init__(self):
+        self.status = WorkerStatus.STARTING
+        self.in_flight_jobs: set[str] = set()
+        # Jobs cancelled by the server before they finished rendering
+        self.interrupted_jobs: set[str] = set()
+        self._jobs_changed = asyncio.Condition()
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether the worker finished warming up and accepts new reports."""
+        return self.status == WorkerStatus.READY
+
+    @property
+    def is_alive(self) -> bool:
+        """Whether the worker process is running."""
+        return self.status != WorkerStatus.STOPPED
+
+    def mark_ready(self):
+        """Marks the worker as ready to accept new reports."""
+        if self.status == WorkerStatus.STARTING:
+            self.status = WorkerStatus.READY
+
+    def begin_drain(self):
+        """Stops the intake of new reports."""
+        if self.status in (WorkerStatus.STARTING, WorkerStatus.READY):
+            logger.info("Albayan Reports Worker stopped accepting new reports.")
+            self.status = WorkerStatus.DRAINING
+
+    @asynccontextmanager
+    async def track_job(self, job_id: str) -> AsyncGenerator[None, None]:
+        """
+        Registers a report job as in flight for the duration of the context. A job
+        cancelled at the drain deadline is recorded as interrupted, its render thread
+        cannot be cancelled and keeps running until the document is written.
+        """
+        self.in_flight_jobs.add(str(job_id))
+        try:
+            yield
+        except asyncio.CancelledError:
+            self.interrupted_jobs.add(str(job_id))
+            raise
+        finally:
+            async with self._jobs_changed:
+                self.in_flight_jobs.discard(str(job_id))
+                self._jobs_changed.notify_all()
+
+    async def wait_for_drain(self, timeout: float) -> set[str]:
+        """Waits for in flight jobs to finish and returns the ones still running at the deadline."""
+        try:
+            async with self._jobs_changed:
+                await asyncio.wait_for(
+                    self._jobs_changed.wait_for(lambda: not self.in_flight_jobs),
+                    timeout,
+                )
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Drain deadline reached with {len(self.in_flight_jobs)} jobs in flight."
+            )
+        return self.in_flight_jobs | self.interrupted_jobs
+
+
+# Lifecycle of this worker process
+worker_lifecycle = WorkerLifecycle()
+
+
+async def prewarm_template(template_id: str):
+    """Loads a template once on the instance it is routed to so later renders start warm."""
+    try:
+        document_report_template = await get_report_template(UUID(template_id))
+        if not document_report_template:
+            logger.warning(f"Prewarm template {template_id} does not exist.")
+            return
+        async with acquire_libreoffice(template_id) as libreoffice:
+            await asyncio.to_thread(
+                libreoffice_utilites.prewarm_template,
+                libreoffice,
+                document_report_template.get("template_file"),
+                config.templates_folder,
+            )
+    except Exception as excep:
+        # A template that fails to prewarm is rendered cold instead of blocking startup
+        logger.warning(f"Failed to prewarm template {template_id}: {excep}")
+
+
+async def start_worker():
+    """Connects LibreOffice instances and DynamoDB tables concurrently then prewarms templates."""
+    config.create_directories_if_not_exists()
+    await asyncio.gather(
+        initialize_libreoffice_instances(),
+        get_dynamodb_table(config.definition_table),
+        get_dynamodb_table(config.processing_table),
+    )
+    await asyncio.gather(
+        *[prewarm_template(template_id) for template_id in config.prewarm_template_ids]
+    )
+    worker_lifecycle.mark_ready()
+
+
+async def requeue_report_jobs(job_ids: set[str]):
+    """
+    Resets unfinished report jobs to pending so they are issued again. A render thread
+    of an interrupted job may still finish before the process exits, which is safe
+    since the reissued job overwrites the same report files and status.
+    """
+    document_creation_table = await get_dynamodb_table(config.processing_table)
+    for job_id in job_ids:
+        try:
+            await DynamodbController.update_document_creation(
+                job_id, ProcessingStatus.PENDING, document_creation_table
+            )
+            logger.info(f"Requeued unfinished report {job_id}.")
+        except Exception as excep:
+            logger.error(f"Failed to requeue report {job_id}: {excep}")
+
+
+async def stop_worker():
+    """
+    Stops intake, drains in flight jobs within the deadline and requeues the rest.
+    The server only runs this once its own graceful shutdown, bounded by the same
+    deadline through timeout_graceful_shutdown, has cancelled the remaining requests.
+    """
+    worker_lifecycle.begin_drain()
+    try:
+        unfinished_jobs = await worker_lifecycle.wait_for_drain(
+            config.shutdown_drain_timeout
+        )
+        if unfinished_jobs:
+            await requeue_report_jobs(unfinished_jobs)
+    finally:
+        worker_lifecycle.status = WorkerStatus.STOPPED
+        # Clean up aioboto3 resources once no job needs them anymore
+        await close_dynamodb_resource()
+
+
+def install_drain_signal_handler():
+    """Stops the intake as soon as SIGTERM arrives, then defers to the server handler."""
+    previous_handler = signal.getsignal(signal.SIGTERM)
+
+    def handle_sigterm(signum, frame):
+        worker_lifecycle.begin_drain()
+        if callable(previous_handler):
+            previous_handler(signum, frame)
+        elif previous_handler == signal.SIG_DFL:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.raise_signal(signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
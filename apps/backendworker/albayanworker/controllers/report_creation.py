@@ -1,35 +1,111 @@
+import asyncio
 import logging
+import random
 from uuid import UUID
-from jsonschema import validate, ValidationError
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
 from albayanworker.dependancies.dyanomodb import get_dynamodb_table
-from albayanworker.dependancies.libreoffice import get_libreoffice
+from albayanworker.dependancies.libreoffice import (
+    acquire_libreoffice,
+    fair_share_scheduler,
+    get_graphic_cache,
+    render_limiter,
+)
 from albayanworker.schemas.document_schemas import (
     SchemaValidationResponse,
     ReportGenerationSchema,
     ProcessingStatus,
+    ReportPriority,
     writter_default_schema,
 )
+from albayanworker.schedulers.fair_share import AdmissionRejected
 from albayanworker.controllers.dynamodb_controlller import DynamodbController
 from albayanworker.configs.config import config
-from albayanworker.utilities import libreoffice_utilites
+from albayanworker.utilities import libreoffice_utilites, uno_tracer
+from albayanworker.utilities.graphic_cache import GraphicCache
+from albayanworker.utilities.shared_cache import SharedFileCache
 
 logger = logging.getLogger(__name__)
+# Report definitions fetched by any worker process on the host, saving DynamoDB round
+# trips. Disabled by default since front API edits are only seen once an entry expires
+definition_cache = SharedFileCache(
+    config.shared_cache_folder + "/definitions", config.definition_cache_ttl
+)
 
 
-def schema_validation(
-    schema_instance: dict, validation_schema: dict
-) -> SchemaValidationResponse:
+def compile_validator(validation_schema: dict) -> any:
     """
-    Validates a given schema instance against a provided validation schema.
+    Checks a validation schema and returns the validator of its JSON Schema draft.
     """
-    try:
-        # Validate the schema instance against the validation schema
-        validate(instance=schema_instance, schema=validation_schema)
-        # If validation is successful, return a positive response
-        return SchemaValidationResponse(True)
-    except ValidationError as e:
+    validator_class = validator_for(validation_schema)
+    validator_class.check_schema(validation_schema)
+    return validator_class(validation_schema)
+
+
+# Report data validator compiled once when the module is imported
+writer_data_validator = compile_validator(writter_default_schema)
+
+
+def schema_validation(schema_instance: dict, validator: any) -> SchemaValidationResponse:
+    """
+    Validates a given schema instance with a compiled schema validator.
+    """
+    # Validate the schema instance against the validation schema
+    error = best_match(validator.iter_errors(schema_instance))
+    if error is not None:
         # If validation fails, return a negative response with the error message
-        return SchemaValidationResponse(False, e.message)
+        return SchemaValidationResponse(False, error.message)
+    # If validation is successful, return a positive response
+    return SchemaValidationResponse(True)
+
+
+async def get_report_template(template_id: UUID) -> dict:
+    """
+    Returns the report template definition from the shared cache or DynamoDB.
+    """
+    if definition_cache.enabled:
+        # Read the shared cache file off the event loop like it is written
+        document_report_template = await asyncio.to_thread(
+            definition_cache.get, str(template_id)
+        )
+        if document_report_template is not None:
+            return document_report_template
+    # Get dyanamodb table for document definitions
+    document_definition_table = await get_dynamodb_table(config.definition_table)
+    # Retrieve the document report template from DynamoDB
+    document_report_template = await DynamodbController.get_template_info(
+        template_id, document_definition_table
+    )
+    if document_report_template and definition_cache.enabled:
+        # Share the definition with the other worker processes
+        await asyncio.to_thread(
+            definition_cache.put, str(template_id), document_report_template
+        )
+    return document_report_template
+
+
+def report_priority(document_creation_request: dict) -> ReportPriority:
+    """
+    Returns the priority class of a report creation request, defaulting to interactive.
+    """
+    try:
+        return ReportPriority(
+            str(document_creation_request.get("priority", "interactive")).lower()
+        )
+    except ValueError:
+        return ReportPriority.INTERACTIVE
+
+
+def report_latency_key(template_id: UUID, report_data: dict) -> str:
+    """
+    Returns the key of renders expected to take about the same time, the template
+    and the power of two bucket of its total table rows.
+    """
+    table_rows = 0
+    for writer_table in report_data.get("writer_tables", []):
+        content = writer_table.get("content", [])
+        table_rows += len(content.get("rows", []) if isinstance(content, dict) else content)
+    return f"{template_id}:{table_rows.bit_length()}"
 
 
 async def process_report_creation(issue_id: UUID) -> ReportGenerationSchema:
@@ -54,12 +130,8 @@ async def process_report_creation(issue_id: UUID) -> ReportGenerationSchema:
     try:
         # Fetch the report template information
         template_id = UUID(document_creation_request.get("report_template_id"))
-        # Get dyanamodb table for document definitions
-        document_definition_table = await get_dynamodb_table(config.definition_table)
-        # Retrieve the document report template from DynamoDB
-        document_report_template = await DynamodbController.get_template_info(
-            template_id, document_definition_table
-        )
+        # Retrieve the document report template from the shared cache or DynamoDB
+        document_report_template = await get_report_template(template_id)
     except Exception as excep:
         # Log and return any exceptions encountered during the process
         logging.error(excep)
@@ -77,11 +149,18 @@ async def process_report_creation(issue_id: UUID) -> ReportGenerationSchema:
         template_format = str(document_report_template.get("template_file_type"))
         template_file_name = document_report_template.get("template_file")
         report_data = document_creation_request.get("report_data")
+        # Tenant and priority class used to schedule the render fairly
+        tenant_id = str(document_creation_request.get("tenant_id") or "default")
+        priority = report_priority(document_creation_request)
+        # Profile the UNO calls of flagged or sampled requests
+        trace_uno_calls = bool(
+            document_creation_request.get("trace_uno_calls")
+        ) or random.random() < config.uno_trace_sample_rate
         # Validate the report data against the template schema
-        validation_results = schema_validation(report_data, writter_default_schema)
+        validation_results = schema_validation(report_data, writer_data_validator)
         if not validation_results.is_valid:
             # Register that the creation was not valid
-            DynamodbController.update_document_creation(
+            await DynamodbController.update_document_creation(
                 issue_id, ProcessingStatus.FAILED, document_creation_table
             )
             # Return failure
@@ -90,14 +169,34 @@ async def process_report_creation(issue_id: UUID) -> ReportGenerationSchema:
             )
         # Process report creation based on the template format
         if template_format == "odf":
-            # Call the function to create a Writer report
-            create_writer_report(template_file_name, report_output_format, report_data)
+            # Wait for the tenant's fair share of render capacity, then render on the
+            # instance where the template is warm
+            async with fair_share_scheduler.slot(tenant_id, priority):
+                async with render_limiter.track(
+                    report_latency_key(template_id, report_data)
+                ):
+                    async with acquire_libreoffice(template_id) as libreoffice:
+                        # Call the function to create a Writer report off the event loop
+                        await asyncio.to_thread(
+                            create_writer_report,
+                            libreoffice,
+                            get_graphic_cache(libreoffice),
+                            issue_id,
+                            template_file_name,
+                            report_output_format,
+                            report_data,
+                            trace_uno_calls,
+                        )
             # Update the document creation status to completed
-            DynamodbController.update_document_creation(
+            await DynamodbController.update_document_creation(
                 issue_id, ProcessingStatus.SUCCESSFUL, document_creation_table
             )
             # Return success response
             return ReportGenerationSchema(True)
+    except AdmissionRejected as excep:
+        # Leave the request pending so it can be issued again once capacity frees up
+        logging.warning(excep)
+        return ReportGenerationSchema(False, "Worker is at capacity, retry later")
     except Exception as excep:
         # Log and return any exceptions encountered during the process
         logging.error(excep)
@@ -105,16 +204,23 @@ async def process_report_creation(issue_id: UUID) -> ReportGenerationSchema:
 
 
 def create_writer_report(
+    libreoffice: any,
+    graphic_cache: GraphicCache,
     report_issue_id: UUID,
     template_file_name: str,
     report_output_format: str,
     report_data: dict,
+    trace_uno_calls: bool = False,
 ):
     """
-    Create a Writer report using LibreOffice based on the provided template and data."""
+    Create a Writer report using LibreOffice based on the provided template and data.
+    When tracing, every UNO call is counted and timed and a profile is written per report."""
+    profile = None
+    if trace_uno_calls:
+        # Wrap the Desktop so the template and everything obtained from it are traced
+        profile = uno_tracer.UnoCallProfile(str(report_issue_id))
+        libreoffice = uno_tracer.trace(libreoffice, profile)
     try:
-        # Get LibreOffice instance
-        libreoffice = get_libreoffice()
         # Open the template document
         document = libreoffice_utilites.open_template(
             libreoffice, template_file_name, config.templates_folder
@@ -132,7 +238,7 @@ def create_writer_report(
         # Replace images in the document with the provided data
         if len(report_data.get("writer_images").keys()) > 0:
             document = libreoffice_utilites.replace_writer_images(
-                document, report_data.get("writer_images"), config.temp_folder
+                document, report_data.get("writer_images"), graphic_cache
             )
         # Fill in the document tables with the provided data
         if len(report_data.get("writer_tables")) > 0:
@@ -156,3 +262,11 @@ def create_writer_report(
         # Log and raise any exceptions encountered during the process
         logging.error(excep)
         raise
+    finally:
+        if profile is not None:
+            try:
+                # Write the JSON profile and the flamegraph collapsed stacks
+                profile_files = profile.dump(config.uno_trace_folder)
+                logger.info(f"UNO call profile written to {profile_files}")
+            except Exception as excep:
+                logging.error(f"Failed to write UNO call profile: {excep}")
@@ -1,4 +1,5 @@
 import aioboto3
+import asyncio
 import logging
 from albayanworker.configs.config import config
 
@@ -9,30 +10,34 @@ logger = logging.getLogger(__name__)
 session = aioboto3.Session()
 _dynamo_resource = None
 _tables_cache = {}
+# A lock so concurrent first calls create a single resource
+_resource_lock = asyncio.Lock()
 
 
 async def get_dynamodb_resource():
     """Initialize and return the persistent aioboto3 DynamoDB resource."""
     global _dynamo_resource
-    if _dynamo_resource is None:
-        # Enter the async context and keep the resource alive for the app lifetime
-        _dynamo_resource = await session.resource(
-            "dynamodb",
-            region_name=config.aws_region,
-            endpoint_url=config.dynamodb_endpoint,
-            aws_access_key_id=config.aws_access_key_id,
-            aws_secret_access_key=config.aws_secret_access_key,
-        ).__aenter__()
-    return _dynamo_resource
+    async with _resource_lock:
+        if _dynamo_resource is None:
+            # Enter the async context and keep the resource alive for the app lifetime
+            _dynamo_resource = await session.resource(
+                "dynamodb",
+                region_name=config.aws_region,
+                endpoint_url=config.dynamodb_endpoint,
+                aws_access_key_id=config.aws_access_key_id,
+                aws_secret_access_key=config.aws_secret_access_key,
+            ).__aenter__()
+        return _dynamo_resource
 
 
 async def close_dynamodb_resource():
     """Close the persistent aioboto3 resource and clear cached tables."""
     global _dynamo_resource, _tables_cache
-    if _dynamo_resource is not None:
-        await _dynamo_resource.__aexit__(None, None, None)
-        _dynamo_resource = None
-        _tables_cache.clear()
+    async with _resource_lock:
+        if _dynamo_resource is not None:
+            await _dynamo_resource.__aexit__(None, None, None)
+            _dynamo_resource = None
+            _tables_cache.clear()
 
 
 async def get_dynamodb_table(table_name: str):
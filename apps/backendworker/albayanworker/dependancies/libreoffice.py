@@ -1,37 +1,214 @@
 import uno
 import asyncio
 import logging
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
 from albayanworker.configs.config import config
-from albayanworker.utilities.libreoffice_utilites import initilize_libreoffice_sync
+from albayanworker.schemas.document_schemas import ReportPriority
+from albayanworker.schedulers.adaptive_limiter import AdaptiveConcurrencyLimiter
+from albayanworker.schedulers.fair_share import FairShareScheduler
+from albayanworker.schedulers.template_affinity import TemplateAffinityScheduler
+from albayanworker.utilities.graphic_cache import GraphicCache
+from albayanworker.utilities.libreoffice_utilites import (
+    initilize_libreoffice_sync,
+    is_libreoffice_connection_failure,
+    is_libreoffice_overload,
+)
 
 # Set up logging
 logger = logging.getLogger(__name__)
-# Global variable to hold the LibreOffice connection
+# Global variable to hold the default LibreOffice connection
 libreoffice = None
+# Connections to every soffice instance keyed by "host:port"
+libreoffice_instances = {}
+# Imported graphics cached per soffice instance keyed by "host:port"
+graphic_caches = {}
 # A lock to ensure thread-safe initialization
 initialization_lock = asyncio.Lock()
+# Reconnection tasks of instances removed after a bridge failure keyed by "host:port"
+recovering_instances = {}
+# Seconds between reconnection attempts, doubling up to the maximum
+RECONNECT_INITIAL_DELAY = 1.0
+RECONNECT_MAX_DELAY = 30.0
+# Scheduler routing templates to the instances where they are warm
+template_scheduler = TemplateAffinityScheduler(config.libreoffice_instance_concurrency)
+# Admission controller adapting render concurrency to observed latency and overload errors
+render_limiter = AdaptiveConcurrencyLimiter(
+    initial_limit=len(config.libreoffice_instances)
+    * config.libreoffice_instance_concurrency,
+    min_limit=config.admission_min_limit,
+    max_limit=config.admission_max_limit,
+    latency_tolerance=config.admission_latency_tolerance,
+    # Never allow more than twice the slots of the registered instances
+    capacity_limit=lambda: 2 * template_scheduler.total_capacity(),
+    overload_error=is_libreoffice_overload,
+)
+# Weighted fair queuing of renders across tenants sized by the current admission limit,
+# the only layer where renders wait for a slot or are shed
+fair_share_scheduler = FairShareScheduler(
+    capacity=render_limiter.current_limit,
+    class_weights={
+        ReportPriority.INTERACTIVE: config.fair_share_interactive_weight,
+        ReportPriority.BULK: config.fair_share_bulk_weight,
+    },
+    tenant_weights=config.fair_share_tenant_weights,
+    tenant_quota=config.fair_share_tenant_quota,
+    interactive_reserve=config.fair_share_interactive_reserve,
+    max_queue=config.fair_share_max_queue,
+    queue_timeout=config.fair_share_queue_timeout,
+)
 
 
-async def get_libreoffice():
+async def connect_libreoffice_instance(instance_id: str) -> tuple:
+    """
+    Connects to the soffice instance identified by "host:port" and returns its remote
+    component context and desktop.
+    """
+    host, port = instance_id.rsplit(":", 1)
+    try:
+        # Initialize the LibreOffice connection in a separate thread to avoid blocking
+        context, connection = await asyncio.to_thread(
+            initilize_libreoffice_sync, host, int(port)
+        )
+        logger.info(f"✅ Successfully connected to LibreOffice at {instance_id}.")
+        return context, connection
+    except Exception as e:
+        logger.error(f"⛔️ Failed to connect to LibreOffice at {instance_id}: {e}")
+        raise
+
+
+def register_libreoffice_connection(instance_id: str, context: any, connection: any):
+    """
+    Stores the connection of an instance with a fresh graphic cache bound to its remote
+    component context. Must be called while holding the initialization lock.
+    """
+    global libreoffice
+    libreoffice_instances[instance_id] = connection
+    graphic_caches[instance_id] = GraphicCache(config.graphic_cache_max_bytes, context)
+    if instance_id == config.libreoffice_instances[0]:
+        libreoffice = connection
+
+
+async def get_libreoffice(instance_id: str = None):
     """
     Initializes and returns a connection to a LibreOffice instance running in headless mode.
     Assumes that LibreOffice is already running and listening on the specified host and port.
+    Without an instance id the first configured instance is returned.
     """
-    # Ensure thsat global variable is used
-    global libreoffice
+    instance_id = instance_id or config.libreoffice_instances[0]
     async with initialization_lock:
         # If already initialized, return the existing connection
-        if libreoffice is not None:
-            return libreoffice
+        if instance_id in libreoffice_instances:
+            return libreoffice_instances[instance_id]
+        context, connection = await connect_libreoffice_instance(instance_id)
+        register_libreoffice_connection(instance_id, context, connection)
+        await template_scheduler.add_instance(instance_id)
+        return connection
+
+
+async def initialize_libreoffice_instances():
+    """Connects to every configured soffice instance concurrently and registers it for scheduling."""
+    global libreoffice
+    pending_instances = [
+        instance_id
+        for instance_id in config.libreoffice_instances
+        if instance_id not in libreoffice_instances
+    ]
+    connections = await asyncio.gather(
+        *[connect_libreoffice_instance(instance_id) for instance_id in pending_instances]
+    )
+    async with initialization_lock:
+        for instance_id, (context, connection) in zip(pending_instances, connections):
+            # Keep a connection made meanwhile by get_libreoffice
+            if instance_id not in libreoffice_instances:
+                register_libreoffice_connection(instance_id, context, connection)
+            await template_scheduler.add_instance(instance_id)
+        libreoffice = libreoffice_instances[config.libreoffice_instances[0]]
+    return libreoffice_instances
+
+
+async def reconnect_libreoffice_instance(instance_id: str):
+    """Reconnects to a restarted soffice instance with backoff and puts it back on the ring."""
+    delay = RECONNECT_INITIAL_DELAY
+    try:
+        while True:
+            try:
+                context, connection = await connect_libreoffice_instance(instance_id)
+                break
+            except Exception:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+        async with initialization_lock:
+            # The new soffice process gets its own context and an empty graphic cache
+            register_libreoffice_connection(instance_id, context, connection)
+        # Rejoin the ring without warm templates so its templates move back
+        await template_scheduler.add_instance(instance_id)
+    finally:
+        recovering_instances.pop(instance_id, None)
+
+
+async def recycle_libreoffice_instance(instance_id: str):
+    """
+    Takes an instance whose bridge failed out of scheduling, so its templates are
+    rebalanced onto the other instances, and reconnects to it in the background.
+    """
+    if instance_id in recovering_instances:
+        return
+    logger.warning(f"⛔️ Lost LibreOffice at {instance_id}, recycling it.")
+    await template_scheduler.remove_instance(instance_id)
+    async with initialization_lock:
+        libreoffice_instances.pop(instance_id, None)
+        # Graphics imported into the previous soffice process are gone
+        if instance_id in graphic_caches:
+            graphic_caches[instance_id].clear()
+    recovering_instances[instance_id] = asyncio.create_task(
+        reconnect_libreoffice_instance(instance_id)
+    )
+
+
+@asynccontextmanager
+async def acquire_libreoffice(template_id: str) -> AsyncGenerator[any, None]:
+    """
+    Reserves a render slot on the instance the template is routed to and yields its
+    connection, releasing the slot when the render finishes. A render failing because
+    the instance died recycles the instance.
+    """
+    async with template_scheduler.slot(str(template_id)) as instance_id:
+        connection = await get_libreoffice(instance_id)
         try:
-            # Initialize the LibreOffice connection in a separate thread to avoid blocking
-            libreoffice = await asyncio.to_thread(
-                initilize_libreoffice_sync,
-                config.libreoffice_host,
-                config.libreoffice_port,
-            )
-            logger.info("✅ Successfully connected to LibreOffice.")
-            return libreoffice
-        except Exception as e:
-            logger.error(f"⛔️ Failed to connect to LibreOffice: {e}")
+            yield connection
+        except Exception as excep:
+            if is_libreoffice_connection_failure(excep):
+                await recycle_libreoffice_instance(instance_id)
             raise
+
+
+def get_graphic_cache(libreoffice: any) -> GraphicCache:
+    """Returns the graphic cache of the soffice instance behind the given connection."""
+    for instance_id, connection in libreoffice_instances.items():
+        if connection is libreoffice:
+            return graphic_caches[instance_id]
+    raise KeyError("Unknown LibreOffice connection")
+
+
+def get_graphic_cache_statistics() -> dict:
+    """Returns the per instance graphic cache size and hit rate."""
+    return {
+        instance_id: graphic_cache.statistics()
+        for instance_id, graphic_cache in graphic_caches.items()
+    }
+
+
+def get_libreoffice_statistics() -> dict:
+    """Returns the per instance affinity hit and queue statistics."""
+    return template_scheduler.statistics()
+
+
+def get_admission_statistics() -> dict:
+    """Returns the current render admission limit and latency signal."""
+    return render_limiter.statistics()
+
+
+def get_fair_share_statistics() -> dict:
+    """Returns the fair share queue, rejection and per tenant dispatch statistics."""
+    return fair_share_scheduler.statistics()
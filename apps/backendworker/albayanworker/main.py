@@ -2,10 +2,14 @@ from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 import logging
-from albayanworker.dependancies.libreoffice import get_libreoffice
-from albayanworker.dependancies.dyanomodb import get_dynamodb_table
-from albayanworker.dependancies.dyanomodb import close_dynamodb_resource
-from albayanworker.configs.config import config
+from albayanworker.controllers.lifecycle_controller import (
+    install_drain_signal_handler,
+    start_worker,
+    stop_worker,
+)
+from albayanworker.routes.health_router import health_router
+from albayanworker.routes.libreoffice_router import libreoffice_router
+from albayanworker.routes.report_creation_router import report_creation_router
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -15,23 +19,24 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
-    """Initilizes connection with libreoffice and check if dynamodb tables exists and folders exits."""
+    """Warms up libreoffice and dynamodb before accepting reports and drains them on shutdown."""
     # Connect to required databases/services
     try:
-        await get_libreoffice()
-        await get_dynamodb_table(config.definition_table)
-        await get_dynamodb_table(config.processing_table)
-        config.create_directories_if_not_exists()
+        install_drain_signal_handler()
+        await start_worker()
         logger.info("Albayan Reports Worker successfully started.")
         yield
     except Exception as e:
         logger.error(f"Failed to connect to one or service or more {e}")
         raise
     finally:
-        # Clean up aioboto3 resources opened during startup
-        await close_dynamodb_resource()
+        # Drain in flight reports and clean up aioboto3 resources opened during startup
+        await stop_worker()
 
 
 app = FastAPI(
     lifespan=lifespan, title="Albayan Reports Backend Worker", version="1.0.0"
 )
+app.include_router(health_router)
+app.include_router(libreoffice_router)
+app.include_router(report_creation_router, prefix="/reports/issue")
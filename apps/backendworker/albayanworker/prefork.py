@@ -0,0 +1,164 @@
+"""
+Supervised prefork mode: one listening socket served by K worker processes, each owning
+a slice of the soffice instances. Run with ``python -m albayanworker.prefork``.
+
+Workers keep no per process copy of shared data that grows with the workload: templates
+are loaded by soffice from the templates folder, report definitions are fetched per
+request (optionally through the on-disk SharedFileCache) and not retained, and the only
+resident schema state is the report data validator compiled once at import.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import signal
+import socket
+import time
+from albayanworker.configs.config import config
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+# Seconds before restarting a crashed worker, doubling while it keeps crashing
+RESTART_INITIAL_DELAY = 1.0
+RESTART_MAX_DELAY = 30.0
+# Seconds a worker must stay up before its restart delay is reset
+RESTART_RESET_AFTER = 60.0
+
+
+def libreoffice_instances_slice(
+    instances: list[str], worker_index: int, worker_processes: int
+) -> list[str]:
+    """Returns the soffice instances owned by a worker, no instance is shared by two workers."""
+    return [
+        instance
+        for instance_index, instance in enumerate(instances)
+        if instance_index % worker_processes == worker_index
+    ]
+
+
+def run_worker(listening_socket: socket.socket, libreoffice_instances: list[str]):
+    """Serves the application on the inherited socket with its own slice of soffice instances."""
+    import uvicorn
+
+    # Restrict the child to its instances before the application modules read the config
+    config.libreoffice_instances = libreoffice_instances
+    from albayanworker.main import app
+
+    # Requests still running at the drain deadline are cancelled so shutdown can requeue them
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app,
+            log_config=None,
+            timeout_graceful_shutdown=config.shutdown_drain_timeout,
+        )
+    )
+    server.run(sockets=[listening_socket])
+
+
+class PreforkSupervisor:
+    """Keeps K worker processes serving one listening socket, restarting them on crash."""
+
+    def __init__(self, host: str, port: int, worker_processes: int):
+        self.host = host
+        self.port = port
+        instance_count = len(config.libreoffice_instances)
+        if worker_processes > instance_count:
+            # Workers sharing an instance would each admit its full concurrency
+            logger.warning(
+                f"Requested {worker_processes} workers for {instance_count} LibreOffice "
+                f"instances, starting {instance_count} workers."
+            )
+        self.worker_processes = max(1, min(worker_processes, instance_count))
+        self.context = multiprocessing.get_context("spawn")
+        self.workers: dict[int, multiprocessing.Process] = {}
+        # Start time and current restart delay of every worker
+        self.started_at: dict[int, float] = {}
+        self.restart_delays: dict[int, float] = {}
+        self.restart_at: dict[int, float] = {}
+        self.should_exit = False
+
+    def bind(self) -> socket.socket:
+        """Binds the listening socket shared by every worker for the supervisor lifetime."""
+        listening_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listening_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listening_socket.bind((self.host, self.port))
+        listening_socket.listen(2048)
+        listening_socket.set_inheritable(True)
+        return listening_socket
+
+    def start_worker(self, worker_index: int, listening_socket: socket.socket):
+        """Starts the worker owning the given slice of soffice instances."""
+        process = self.context.Process(
+            target=run_worker,
+            args=(
+                listening_socket,
+                libreoffice_instances_slice(
+                    config.libreoffice_instances, worker_index, self.worker_processes
+                ),
+            ),
+            name=f"albayanworker-{worker_index}",
+        )
+        process.start()
+        self.workers[worker_index] = process
+        self.started_at[worker_index] = time.monotonic()
+        logger.info(f"Started worker {worker_index} with pid {process.pid}.")
+
+    def schedule_restart(self, worker_index: int, exitcode: int):
+        """Delays the restart of a crashed worker, backing off while it keeps crashing."""
+        now = time.monotonic()
+        delay = self.restart_delays.get(worker_index, RESTART_INITIAL_DELAY)
+        if now - self.started_at[worker_index] >= RESTART_RESET_AFTER:
+            delay = RESTART_INITIAL_DELAY
+        self.restart_delays[worker_index] = min(delay * 2, RESTART_MAX_DELAY)
+        self.restart_at[worker_index] = now + delay
+        logger.warning(
+            f"Worker {worker_index} exited with code {exitcode}, restarting in {delay:.0f}s."
+        )
+
+    def handle_exit(self, signum, frame):
+        """Stops restarting workers and forwards the signal so they drain."""
+        self.should_exit = True
+        for process in self.workers.values():
+            if process.is_alive():
+                process.terminate()
+
+    def run(self):
+        """Starts the workers and restarts any that exits until the supervisor is stopped."""
+        listening_socket = self.bind()
+        signal.signal(signal.SIGTERM, self.handle_exit)
+        signal.signal(signal.SIGINT, self.handle_exit)
+        logger.info(
+            f"Albayan Reports Worker supervisor listening on {self.host}:{self.port} "
+            f"with {self.worker_processes} workers."
+        )
+        try:
+            for worker_index in range(self.worker_processes):
+                self.start_worker(worker_index, listening_socket)
+            while not self.should_exit:
+                time.sleep(1)
+                for worker_index, process in list(self.workers.items()):
+                    if process.is_alive() or self.should_exit:
+                        continue
+                    # The socket stays open in the supervisor so no connection is refused
+                    if worker_index not in self.restart_at:
+                        self.schedule_restart(worker_index, process.exitcode)
+                    if time.monotonic() >= self.restart_at[worker_index]:
+                        del self.restart_at[worker_index]
+                        self.start_worker(worker_index, listening_socket)
+        finally:
+            for process in self.workers.values():
+                process.join(config.shutdown_drain_timeout + 5)
+                if process.is_alive():
+                    process.kill()
+            listening_socket.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Albayan Reports prefork worker")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=config.worker_processes)
+    arguments = parser.parse_args()
+    PreforkSupervisor(arguments.host, arguments.port, arguments.workers).run()
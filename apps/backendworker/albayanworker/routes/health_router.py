@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from albayanworker.controllers.lifecycle_controller import worker_lifecycle
+
+health_router = APIRouter()
+
+
+@health_router.get(
+    "/health/live",
+    title="Liveness Probe",
+    description="Reports whether the worker process is running.",
+)
+async def liveness() -> JSONResponse:
+    status_code = 200 if worker_lifecycle.is_alive else 503
+    return JSONResponse(
+        status_code=status_code, content={"status": worker_lifecycle.status.value}
+    )
+
+
+@health_router.get(
+    "/health/ready",
+    title="Readiness Probe",
+    description="Reports whether the worker is warmed up and accepting new reports.",
+)
+async def readiness() -> JSONResponse:
+    status_code = 200 if worker_lifecycle.is_ready else 503
+    return JSONResponse(
+        status_code=status_code, content={"status": worker_lifecycle.status.value}
+    )
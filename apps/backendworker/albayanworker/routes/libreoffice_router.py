@@ -0,0 +1,45 @@
+from fastapi import APIRouter
+from albayanworker.dependancies.libreoffice import (
+    get_admission_statistics,
+    get_fair_share_statistics,
+    get_graphic_cache_statistics,
+    get_libreoffice_statistics,
+)
+
+libreoffice_router = APIRouter()
+
+
+@libreoffice_router.get(
+    "/libreoffice/statistics",
+    title="Retrieve LibreOffice Scheduling Statistics",
+    description="Per instance template affinity hits, spill-overs and queue lengths.",
+)
+async def retrieve_libreoffice_statistics() -> dict:
+    return get_libreoffice_statistics()
+
+
+@libreoffice_router.get(
+    "/libreoffice/admission",
+    title="Retrieve Render Admission Statistics",
+    description="Current adaptive render concurrency limit, latency signal and overload errors.",
+)
+async def retrieve_admission_statistics() -> dict:
+    return get_admission_statistics()
+
+
+@libreoffice_router.get(
+    "/libreoffice/fair-share",
+    title="Retrieve Fair Share Scheduling Statistics",
+    description="Queue length, rejections and per tenant in flight, queued and dispatched renders.",
+)
+async def retrieve_fair_share_statistics() -> dict:
+    return get_fair_share_statistics()
+
+
+@libreoffice_router.get(
+    "/libreoffice/graphics",
+    title="Retrieve Graphic Cache Statistics",
+    description="Per instance cached image count, bytes, hit rate and evictions.",
+)
+async def retrieve_graphic_cache_statistics() -> dict:
+    return get_graphic_cache_statistics()
@@ -1,5 +1,6 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from uuid import UUID
+from albayanworker.controllers.lifecycle_controller import worker_lifecycle
 from albayanworker.controllers.report_creation import process_report_creation
 from albayanworker.schemas.document_schemas import ReportGenerationSchema
 
@@ -7,10 +8,14 @@ report_creation_router = APIRouter()
 
 
 @report_creation_router.get(
-    "{issue_id}",
+    "/{issue_id}",
     response_model=ReportGenerationSchema,
     title="Retrieve Report Creation Status",
     description="Create report if it is not already created and retrieve the status.",
 )
 async def retrieve_report(issue_id: UUID) -> ReportGenerationSchema:
-    return await process_report_creation(issue_id)
+    # Refuse new reports while the worker is warming up or draining
+    if not worker_lifecycle.is_ready:
+        raise HTTPException(status_code=503, detail="Worker is not accepting reports")
+    async with worker_lifecycle.track_job(issue_id):
+        return await process_report_creation(issue_id)
@@ -0,0 +1,149 @@
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Callable, Optional
+
+
+def is_overload_error(excep: BaseException) -> bool:
+    """Whether a failed render points at an overloaded backend rather than bad input."""
+    return isinstance(excep, (TimeoutError, asyncio.TimeoutError, ConnectionError))
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Computes a render concurrency limit that follows observed latency and overload
+    errors (additive increase, multiplicative decrease). Latency is compared with the
+    baseline of the same kind of render, so a mix of small and large reports is not
+    mistaken for congestion.
+
+    The limiter does not queue or shed work itself, the fair share scheduler sizes its
+    capacity with current_limit and is the single place where renders wait or are shed.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        latency_tolerance: float = 2.0,
+        backoff_ratio: float = 0.9,
+        smoothing: float = 0.2,
+        capacity_limit: Optional[Callable[[], int]] = None,
+        overload_error: Callable[[BaseException], bool] = is_overload_error,
+        max_latency_keys: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.latency_tolerance = latency_tolerance
+        self.backoff_ratio = backoff_ratio
+        self.smoothing = smoothing
+        # Optional upper bound derived from the currently healthy soffice instances
+        self.capacity_limit = capacity_limit
+        # Decides which render failures count as overload, other failures are ignored
+        self.overload_error = overload_error
+        self.max_latency_keys = max_latency_keys
+        self.clock = clock
+        self.in_flight = 0
+        self.completed = 0
+        self.errors = 0
+        self.decreases = 0
+        self.latency_ewma: Optional[float] = None
+        # Smoothed ratio of render latency to the baseline of its latency key
+        self.latency_ratio_ewma: Optional[float] = None
+        # Latency key -> slowly rising baseline of its fastest renders, least recent first
+        self.baseline_latencies: OrderedDict[str, float] = OrderedDict()
+        self._last_decrease = float("-inf")
+
+    def current_limit(self) -> int:
+        """Returns the integer concurrency limit currently enforced."""
+        limit = int(self.limit)
+        if self.capacity_limit is not None:
+            limit = min(limit, max(self.min_limit, self.capacity_limit()))
+        return max(self.min_limit, limit)
+
+    def _baseline_latency(self, latency_key: str, latency: float) -> float:
+        """Updates and returns the baseline latency of a latency key."""
+        baseline = self.baseline_latencies.pop(latency_key, latency)
+        if latency < baseline:
+            baseline = latency
+        else:
+            baseline += 0.01 * (latency - baseline)
+        self.baseline_latencies[latency_key] = baseline
+        if len(self.baseline_latencies) > self.max_latency_keys:
+            self.baseline_latencies.popitem(last=False)
+        return baseline
+
+    def _record_sample(
+        self, latency_key: str, latency: float, failed: bool, saturated: bool
+    ):
+        """Adjusts the limit after a render finished."""
+        if failed:
+            self.errors += 1
+        else:
+            baseline = self._baseline_latency(latency_key, latency)
+            ratio = latency / baseline if baseline > 0 else 1.0
+            # Smooth the latency and its ratio to the baseline of the same kind of render
+            if self.latency_ewma is None:
+                self.latency_ewma = latency
+                self.latency_ratio_ewma = ratio
+            else:
+                self.latency_ewma += self.smoothing * (latency - self.latency_ewma)
+                self.latency_ratio_ewma += self.smoothing * (
+                    ratio - self.latency_ratio_ewma
+                )
+        congested = (
+            self.latency_ratio_ewma is not None
+            and self.latency_ratio_ewma > self.latency_tolerance
+        )
+        now = self.clock()
+        if failed or congested:
+            # Back off at most once per observed render latency so one burst is not punished twice
+            if now - self._last_decrease >= (self.latency_ewma or 0.0):
+                self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+                self._last_decrease = now
+                self.decreases += 1
+        elif saturated:
+            # Grow by roughly one slot per limit worth of successful renders
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    @asynccontextmanager
+    async def track(self, latency_key: str = "") -> AsyncGenerator[None, None]:
+        """
+        Measures a render running under the limit for the duration of the context.
+        Renders sharing a latency key are expected to take about the same time.
+        """
+        self.in_flight += 1
+        saturated = self.in_flight >= self.current_limit()
+        started = self.clock()
+        failed = False
+        sampled = True
+        try:
+            yield
+        except BaseException as excep:
+            # Invalid input, template errors or cancellations say nothing about the backend load
+            failed = self.overload_error(excep)
+            sampled = failed
+            raise
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            if sampled:
+                self._record_sample(
+                    latency_key, self.clock() - started, failed, saturated
+                )
+
+    def statistics(self) -> dict:
+        """Returns the limiter state and render counters."""
+        return {
+            "limit": self.current_limit(),
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "errors": self.errors,
+            "decreases": self.decreases,
+            "latency_ewma": self.latency_ewma,
+            "latency_ratio_ewma": self.latency_ratio_ewma,
+            "latency_keys": len(self.baseline_latencies),
+        }
@@ -0,0 +1,235 @@
+import asyncio
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, Callable
+from albayanworker.schemas.document_schemas import ReportPriority
+
+
+class AdmissionRejected(Exception):
+    """Raised when a render is shed because the worker is at capacity."""
+
+
+@dataclass
+class FairShareTicket:
+    """A report waiting for a render slot."""
+
+    tenant_id: str
+    priority: ReportPriority
+    finish_tag: float
+    enqueued_at: float
+    future: asyncio.Future = field(repr=False)
+
+
+@dataclass
+class TenantStatistics:
+    """Per tenant fair share statistics."""
+
+    in_flight: int = 0
+    queued: int = 0
+    dispatched: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+    total_wait_seconds: float = 0.0
+    # Finish tag of the last request of each priority class
+    last_finish_tags: dict = field(default_factory=dict)
+
+    def as_dict(self) -> dict:
+        """Returns the statistics as a JSON serializable dictionary."""
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "dispatched": self.dispatched,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "average_wait_seconds": (
+                self.total_wait_seconds / self.dispatched if self.dispatched else 0.0
+            ),
+        }
+
+
+class FairShareScheduler:
+    """
+    Weighted fair queuing of report renders across tenants and priority classes.
+
+    Every (tenant, priority) flow gets finish tags advancing by the inverse of its weight,
+    the flow head with the smallest tag is dispatched first, and tags shrink with the time
+    already waited (up to a bounded boost) so low weight flows are not starved. Tenants are
+    capped at a concurrency quota and bulk renders never take the slots reserved for
+    interactive ones.
+
+    This is the only layer where renders wait or are shed: requests are rejected when the
+    queue is full or when they waited longer than the queue timeout for a slot.
+    """
+
+    def __init__(
+        self,
+        capacity: Callable[[], int],
+        class_weights: dict[ReportPriority, float],
+        tenant_weights: dict[str, float] = None,
+        tenant_quota: int = 0,
+        interactive_reserve: int = 1,
+        aging_rate: float = 0.01,
+        aging_limit: float = 0.5,
+        max_queue: int = 1000,
+        queue_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.capacity = capacity
+        self.class_weights = class_weights
+        self.tenant_weights = tenant_weights or {}
+        self.tenant_quota = tenant_quota
+        self.interactive_reserve = interactive_reserve
+        self.aging_rate = aging_rate
+        self.aging_limit = aging_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.clock = clock
+        self.virtual_time = 0.0
+        self.in_flight = 0
+        self.in_flight_by_class = defaultdict(int)
+        self.queued = 0
+        self.rejected = 0
+        self.timed_out = 0
+        # FIFO of waiting tickets per (tenant, priority) flow, finish tags increase along it
+        self.flows: dict[tuple, deque] = defaultdict(deque)
+        self.tenants: dict[str, TenantStatistics] = defaultdict(TenantStatistics)
+
+    def _weight(self, tenant_id: str, priority: ReportPriority) -> float:
+        return self.tenant_weights.get(tenant_id, 1.0) * self.class_weights.get(
+            priority, 1.0
+        )
+
+    def _aged_tag(self, ticket: FairShareTicket, now: float) -> float:
+        """Returns the finish tag lowered by the bounded aging boost."""
+        boost = min(self.aging_limit, self.aging_rate * (now - ticket.enqueued_at))
+        return ticket.finish_tag - boost
+
+    def _can_dispatch(self, ticket: FairShareTicket, capacity: int) -> bool:
+        """Checks the tenant quota and the interactive reserve for a waiting request."""
+        tenant = self.tenants[ticket.tenant_id]
+        if self.tenant_quota and tenant.in_flight >= self.tenant_quota:
+            return False
+        if ticket.priority == ReportPriority.BULK:
+            bulk_capacity = max(1, capacity - self.interactive_reserve)
+            return self.in_flight_by_class[ReportPriority.BULK] < bulk_capacity
+        return True
+
+    def _pop_flow_head(self, ticket: FairShareTicket):
+        """Removes the ticket from the head of its flow, dropping the flow once empty."""
+        flow_key = (ticket.tenant_id, ticket.priority)
+        self.flows[flow_key].popleft()
+        if not self.flows[flow_key]:
+            del self.flows[flow_key]
+        self.queued -= 1
+
+    def _dispatch(self):
+        """Hands free slots to the waiting requests with the smallest aged finish tags."""
+        capacity = max(1, self.capacity())
+        now = self.clock()
+        while self.in_flight < capacity and self.queued:
+            # Only flow heads compete, they are the oldest and lowest tagged of their flow
+            eligible = [
+                flow[0]
+                for flow in self.flows.values()
+                if flow and self._can_dispatch(flow[0], capacity)
+            ]
+            if not eligible:
+                return
+            ticket = min(eligible, key=lambda ticket: self._aged_tag(ticket, now))
+            self._pop_flow_head(ticket)
+            tenant = self.tenants[ticket.tenant_id]
+            if ticket.future.done():
+                # The waiter was cancelled before its slot came up
+                tenant.queued -= 1
+                continue
+            tenant.queued -= 1
+            tenant.in_flight += 1
+            tenant.dispatched += 1
+            tenant.total_wait_seconds += now - ticket.enqueued_at
+            self.in_flight += 1
+            self.in_flight_by_class[ticket.priority] += 1
+            self.virtual_time = max(self.virtual_time, ticket.finish_tag)
+            ticket.future.set_result(True)
+
+    def release(self, tenant_id: str, priority: ReportPriority):
+        """Releases a render slot and dispatches the next waiting requests."""
+        self.tenants[tenant_id].in_flight -= 1
+        self.in_flight -= 1
+        self.in_flight_by_class[priority] -= 1
+        self._dispatch()
+
+    async def acquire(self, tenant_id: str, priority: ReportPriority):
+        """
+        Waits until the request is dispatched under weighted fair queuing, raising
+        AdmissionRejected when the queue is full or the wait exceeds the queue timeout.
+        """
+        tenant = self.tenants[tenant_id]
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            tenant.rejected += 1
+            raise AdmissionRejected("Fair share queue is full")
+        # Tag the request relative to the flow's previous request and the virtual clock
+        start_tag = max(self.virtual_time, tenant.last_finish_tags.get(priority, 0.0))
+        finish_tag = start_tag + 1.0 / self._weight(tenant_id, priority)
+        tenant.last_finish_tags[priority] = finish_tag
+        ticket = FairShareTicket(
+            tenant_id,
+            priority,
+            finish_tag,
+            self.clock(),
+            asyncio.get_running_loop().create_future(),
+        )
+        flow = self.flows[(tenant_id, priority)]
+        flow.append(ticket)
+        self.queued += 1
+        tenant.queued += 1
+        self._dispatch()
+        try:
+            await asyncio.wait_for(ticket.future, self.queue_timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError) as excep:
+            if ticket in flow:
+                flow.remove(ticket)
+                self.queued -= 1
+                tenant.queued -= 1
+            elif ticket.future.done() and not ticket.future.cancelled():
+                # Dispatched right before the cancellation, give the slot back
+                self.release(tenant_id, priority)
+            if isinstance(excep, asyncio.TimeoutError):
+                self.rejected += 1
+                self.timed_out += 1
+                tenant.rejected += 1
+                tenant.timed_out += 1
+                raise AdmissionRejected("Timed out waiting for a fair share slot")
+            raise
+
+    @asynccontextmanager
+    async def slot(
+        self, tenant_id: str, priority: ReportPriority
+    ) -> AsyncGenerator[None, None]:
+        """Holds a fairly scheduled render slot for the duration of the context."""
+        await self.acquire(tenant_id, priority)
+        try:
+            yield
+        finally:
+            self.release(tenant_id, priority)
+
+    def statistics(self) -> dict:
+        """Returns the overall and per tenant fair share statistics."""
+        return {
+            "capacity": self.capacity(),
+            "in_flight": self.in_flight,
+            "in_flight_by_class": {
+                priority.value: count
+                for priority, count in self.in_flight_by_class.items()
+            },
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "virtual_time": self.virtual_time,
+            "tenants": {
+                tenant_id: statistics.as_dict()
+                for tenant_id, statistics in self.tenants.items()
+            },
+        }
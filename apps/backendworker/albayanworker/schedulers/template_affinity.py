@@ -0,0 +1,227 @@
+import asyncio
+import bisect
+import hashlib
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, Optional
+
+
+@dataclass
+class InstanceStatistics:
+    """Per soffice instance scheduling statistics."""
+
+    capacity: int
+    available: bool = True
+    in_flight: int = 0
+    queued: int = 0
+    affinity_hits: int = 0
+    affinity_misses: int = 0
+    spilled_in: int = 0
+    completed: int = 0
+    recycled: int = 0
+    # Templates recently rendered on the instance, oldest first
+    warm_templates: OrderedDict = field(default_factory=OrderedDict)
+
+    def as_dict(self) -> dict:
+        """Returns the statistics as a JSON serializable dictionary."""
+        requests = self.affinity_hits + self.affinity_misses
+        return {
+            "capacity": self.capacity,
+            "available": self.available,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "affinity_hits": self.affinity_hits,
+            "affinity_misses": self.affinity_misses,
+            "affinity_hit_rate": self.affinity_hits / requests if requests else 0.0,
+            "spilled_in": self.spilled_in,
+            "completed": self.completed,
+            "recycled": self.recycled,
+            "warm_templates": len(self.warm_templates),
+        }
+
+
+class TemplateAffinityScheduler:
+    """
+    Routes renders of the same template to the same soffice instance using a
+    consistent hash ring, spilling over to idle instances when the preferred
+    instance is saturated and queueing when every instance is busy.
+    """
+
+    def __init__(
+        self,
+        instance_capacity: int = 1,
+        virtual_nodes: int = 64,
+        warm_templates_limit: int = 64,
+    ):
+        self.instance_capacity = max(1, instance_capacity)
+        self.virtual_nodes = virtual_nodes
+        self.warm_templates_limit = warm_templates_limit
+        self._ring_hashes: list[int] = []
+        self._ring_instances: list[str] = []
+        self._instances: dict[str, InstanceStatistics] = {}
+        self._condition = asyncio.Condition()
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        """Returns a stable 64 bit hash of the given key."""
+        return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+    async def add_instance(self, instance_id: str):
+        """
+        Adds an instance and its virtual nodes to the hash ring. Adding back a removed
+        instance counts as a recycle and starts it without warm templates.
+        """
+        async with self._condition:
+            statistics = self._instances.get(instance_id)
+            if statistics is not None and statistics.available:
+                return
+            if statistics is None:
+                self._instances[instance_id] = InstanceStatistics(self.instance_capacity)
+            else:
+                statistics.available = True
+                statistics.recycled += 1
+            for virtual_node in range(self.virtual_nodes):
+                node_hash = self._hash(f"{instance_id}#{virtual_node}")
+                position = bisect.bisect(self._ring_hashes, node_hash)
+                self._ring_hashes.insert(position, node_hash)
+                self._ring_instances.insert(position, instance_id)
+            # Waiters may be able to use the instance
+            self._condition.notify_all()
+
+    async def remove_instance(self, instance_id: str):
+        """
+        Removes a dead instance from the hash ring, its templates move to the ring
+        successors. Its statistics are kept until the instance is added back.
+        """
+        async with self._condition:
+            statistics = self._instances.get(instance_id)
+            if statistics is None or not statistics.available:
+                return
+            statistics.available = False
+            # Templates loaded by the dead soffice process are gone
+            statistics.warm_templates.clear()
+            remaining = [
+                (node_hash, node_instance)
+                for node_hash, node_instance in zip(
+                    self._ring_hashes, self._ring_instances
+                )
+                if node_instance != instance_id
+            ]
+            self._ring_hashes = [node_hash for node_hash, _ in remaining]
+            self._ring_instances = [node_instance for _, node_instance in remaining]
+            # Waiters queued behind the instance reselect among the remaining ones
+            self._condition.notify_all()
+
+    def available_instances(self) -> list[str]:
+        """Returns the instances currently on the hash ring."""
+        return [
+            instance_id
+            for instance_id, statistics in self._instances.items()
+            if statistics.available
+        ]
+
+    def preferred_instances(self, template_id: str) -> list[str]:
+        """Returns the distinct instances in ring order starting at the template position."""
+        if not self._ring_hashes:
+            return []
+        start = bisect.bisect(self._ring_hashes, self._hash(template_id))
+        available_count = len(self.available_instances())
+        ordered_instances = []
+        for offset in range(len(self._ring_instances)):
+            instance_id = self._ring_instances[(start + offset) % len(self._ring_instances)]
+            if instance_id not in ordered_instances:
+                ordered_instances.append(instance_id)
+                if len(ordered_instances) == available_count:
+                    break
+        return ordered_instances
+
+    def _select_instance(self, template_id: str) -> Optional[str]:
+        """Selects the instance for a template or None if every instance is saturated."""
+        candidates = self.preferred_instances(template_id)
+        if not candidates:
+            return None
+        # Use the preferred instance while it still has free capacity
+        preferred = self._instances[candidates[0]]
+        if preferred.in_flight < preferred.capacity:
+            return candidates[0]
+        available = [
+            instance_id
+            for instance_id in candidates
+            if self._instances[instance_id].in_flight
+            < self._instances[instance_id].capacity
+        ]
+        if not available:
+            return None
+        # Spill over to an instance where the template is warm, otherwise the least loaded one
+        return min(
+            available,
+            key=lambda instance_id: (
+                template_id not in self._instances[instance_id].warm_templates,
+                self._instances[instance_id].in_flight,
+            ),
+        )
+
+    async def acquire(self, template_id: str) -> str:
+        """Waits for and reserves a render slot for the template, returning the instance id."""
+        template_id = str(template_id)
+        async with self._condition:
+            if not self._ring_hashes:
+                raise RuntimeError("No LibreOffice instances are available")
+            instance_id = self._select_instance(template_id)
+            if instance_id is None:
+                # Queue against the preferred instance until a slot is released
+                queued_on = self.preferred_instances(template_id)[0]
+                self._instances[queued_on].queued += 1
+                try:
+                    while instance_id is None:
+                        await self._condition.wait()
+                        instance_id = self._select_instance(template_id)
+                finally:
+                    self._instances[queued_on].queued -= 1
+            statistics = self._instances[instance_id]
+            statistics.in_flight += 1
+            if instance_id != self.preferred_instances(template_id)[0]:
+                statistics.spilled_in += 1
+            # Record whether the template was already warm on the instance
+            if template_id in statistics.warm_templates:
+                statistics.affinity_hits += 1
+                statistics.warm_templates.move_to_end(template_id)
+            else:
+                statistics.affinity_misses += 1
+                statistics.warm_templates[template_id] = True
+                if len(statistics.warm_templates) > self.warm_templates_limit:
+                    statistics.warm_templates.popitem(last=False)
+            return instance_id
+
+    async def release(self, instance_id: str):
+        """Releases a render slot previously reserved with acquire."""
+        async with self._condition:
+            statistics = self._instances[instance_id]
+            statistics.in_flight -= 1
+            statistics.completed += 1
+            self._condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(self, template_id: str) -> AsyncGenerator[str, None]:
+        """Reserves a render slot for the duration of the context."""
+        instance_id = await self.acquire(template_id)
+        try:
+            yield instance_id
+        finally:
+            await self.release(instance_id)
+
+    def total_capacity(self) -> int:
+        """Returns the number of render slots across the available instances."""
+        return sum(
+            statistics.capacity
+            for statistics in self._instances.values()
+            if statistics.available
+        )
+
+    def statistics(self) -> dict:
+        """Returns the scheduling statistics of every instance."""
+        return {
+            instance_id: statistics.as_dict()
+            for instance_id, statistics in self._instances.items()
+        }
@@ -13,6 +13,15 @@ class ProcessingStatus(Enum):
     FAILED = "failed"
 
 
+class ReportPriority(Enum):
+    """
+    An enumeration of report priority classes.
+    """
+
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+
+
 @dataclass
 class SchemaValidationResponse:
     """Schema validation response dataclass."""
@@ -74,11 +83,34 @@ writter_default_schema = {
                 "properties": {
                     "table_name": {"type": "string"},
                     "content": {
-                        "type": "array",
-                        "items": {
-                            "type": "object",
-                            "patternProperties": {"^.*$": {"type": "string"}},
-                        },
+                        "anyOf": [
+                            {
+                                "type": "object",
+                                "required": ["columns", "rows"],
+                                "properties": {
+                                    "columns": {
+                                        "type": "array",
+                                        "items": {"type": "string"},
+                                    },
+                                    "rows": {
+                                        "type": "array",
+                                        "items": {
+                                            "type": "array",
+                                            "items": {"type": "string"},
+                                        },
+                                    },
+                                },
+                                "description": "Columnar content, column names once and each row as an array of values.",
+                            },
+                            {
+                                "type": "array",
+                                "items": {
+                                    "type": "object",
+                                    "patternProperties": {"^.*$": {"type": "string"}},
+                                },
+                                "description": "Row content, each row as an object keyed by column name.",
+                            },
+                        ]
                     },
                     "footer": {
                         "type": "object",
@@ -0,0 +1,12 @@
+from enum import Enum
+
+
+class WorkerStatus(Enum):
+    """
+    An enumeration of worker lifecycle statuses.
+    """
+
+    STARTING = "starting"
+    READY = "ready"
+    DRAINING = "draining"
+    STOPPED = "stopped"
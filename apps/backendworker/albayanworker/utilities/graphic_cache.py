@@ -0,0 +1,105 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+
+class PendingImport:
+    """An image being imported by one render while others wait for its graphic."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.graphic = None
+
+
+class GraphicCache:
+    """
+    Byte bounded LRU cache of imported XGraphic objects for one soffice instance,
+    keyed by a hash of the base64 image content so repeated logos and signatures
+    are decoded and imported only once. Holds the remote component context of the
+    instance, the graphics only exist in that soffice process.
+    """
+
+    def __init__(self, max_bytes: int, component_context: any = None):
+        self.max_bytes = max_bytes
+        self.component_context = component_context
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # Content hash -> (graphic, decoded size in bytes), least recently used first
+        self._entries = OrderedDict()
+        # Content hash -> import in progress, so concurrent misses import only once
+        self._pending: dict[str, PendingImport] = {}
+
+    @staticmethod
+    def content_hash(base64_string: str) -> str:
+        """Returns the hash identifying the image content without decoding it."""
+        return hashlib.sha256(base64_string.encode("ascii", "ignore")).hexdigest()
+
+    def get_or_import(
+        self, base64_string: str, import_graphic: Callable[[str], tuple]
+    ) -> any:
+        """
+        Returns the cached graphic of the image or imports it with import_graphic,
+        which receives the base64 string and returns the graphic and its decoded size.
+        """
+        key = self.content_hash(base64_string)
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    return entry[0]
+                pending = self._pending.get(key)
+                if pending is None:
+                    self.misses += 1
+                    pending = self._pending[key] = PendingImport()
+                    break
+            # Another render is importing the same image, wait and reuse its graphic
+            pending.done.wait()
+            if pending.graphic is not None:
+                with self._lock:
+                    self.hits += 1
+                return pending.graphic
+        try:
+            # Decode and import outside the lock so other renders are not blocked
+            graphic, size = import_graphic(base64_string)
+            pending.graphic = graphic
+            with self._lock:
+                if key not in self._entries and size <= self.max_bytes:
+                    self._entries[key] = (graphic, size)
+                    self.current_bytes += size
+                    # Evict the least recently used graphics until the cache fits its budget
+                    while self.current_bytes > self.max_bytes:
+                        _, (_, evicted_size) = self._entries.popitem(last=False)
+                        self.current_bytes -= evicted_size
+                        self.evictions += 1
+            return graphic
+        finally:
+            # Wake the waiters, they retry the import themselves if this one failed
+            with self._lock:
+                self._pending.pop(key, None)
+            pending.done.set()
+
+    def clear(self):
+        """Drops every cached graphic, used when the soffice instance is recycled."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def statistics(self) -> dict:
+        """Returns the cache size and hit rate."""
+        requests = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "importing": len(self._pending),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+            "evictions": self.evictions,
+        }
@@ -1,12 +1,14 @@
 import base64
 import pathlib
 import uno
-import uuid
 
 
-def initilize_libreoffice_sync(libreoffice_host: str, libreoffice_port: int):
+def initilize_libreoffice_sync(libreoffice_host: str, libreoffice_port: int) -> tuple:
     """
     Synchronous helper function to initialize LibreOffice connection.
+
+    Returns:
+        tuple: The remote component context of the instance and its desktop.
     """
     # Get the local UNO component context
     localContext = uno.getComponentContext()
@@ -22,12 +24,57 @@ def initilize_libreoffice_sync(libreoffice_host: str, libreoffice_port: int):
     libreoffice = context.ServiceManager.createInstanceWithContext(
         "com.sun.star.frame.Desktop", context
     )
-    return libreoffice
+    return context, libreoffice
+
+
+# UNO exceptions raised when the bridge to a soffice instance is gone
+LIBREOFFICE_CONNECTION_EXCEPTIONS = {
+    "DisposedException",
+    "NoConnectException",
+    "ConnectionSetupException",
+}
+
 
+def uno_exception_names(excep: BaseException) -> set[str]:
+    """Returns the short UNO type names of an exception and its base classes."""
+    return {
+        exception_class.__name__.rsplit(".", 1)[-1]
+        for exception_class in type(excep).__mro__
+    }
+
+
+def is_libreoffice_connection_failure(excep: BaseException) -> bool:
+    """Whether the exception means the soffice instance died or the bridge was disposed."""
+    if isinstance(excep, ConnectionError):
+        return True
+    exception_names = uno_exception_names(excep)
+    if exception_names & LIBREOFFICE_CONNECTION_EXCEPTIONS:
+        return True
+    # A dying URP bridge surfaces as a plain RuntimeException mentioning the bridge
+    message = str(getattr(excep, "Message", excep)).lower()
+    return "RuntimeException" in exception_names and (
+        "bridge" in message or "disposed" in message
+    )
 
-def create_prop():
+
+def is_libreoffice_overload(excep: BaseException) -> bool:
+    """
+    Whether a failed render points at an overloaded or failing soffice instance. Other
+    UNO runtime errors come from the template or the report data and are not counted.
+    """
+    if isinstance(excep, (TimeoutError, ConnectionError)):
+        return True
+    return is_libreoffice_connection_failure(excep)
+
+
+def create_prop(name: str = None, value: any = None):
     """Creates and returns a UNO PropertyValue struct."""
-    return uno.createUnoStruct("com.sun.star.beans.PropertyValue")
+    prop = uno.createUnoStruct("com.sun.star.beans.PropertyValue")
+    # Set the name and value when provided
+    if name is not None:
+        prop.Name = name
+        prop.Value = value
+    return prop
 
 
 def create_document_url(file_path: str) -> str:
@@ -82,40 +129,50 @@ def writer_fill_tables(document, data: dict):
     # If there are no tables in the document, return as is
     if tables.getCount() == 0:
         return document
+    # Index the provided tables by name once
+    writer_tables_map = {
+        writer_table["table_name"]: writer_table for writer_table in writer_tables
+    }
     for table in tables:
-        table_name = table.getName()
-        # Check if the table is in the provided writer tables and skip if not
-        if table_name not in [writer_table["name"] for writer_table in writer_tables]:
+        # Get the corresponding data for the table and skip if not provided
+        table_data = writer_tables_map.get(table.getName())
+        if table_data is None:
             continue
-        # Get the corresponding data for the table
-        table_data = next(
-            (
-                writer_table
-                for writer_table in writer_tables
-                if writer_table["name"] == table_name
-            ),
-            None,
-        )
         # Get the original number of rows in the table
         orginal_table_rows = table.getRows().getCount()
         # Determine the number of footer rows
         footer_rows = 0 if orginal_table_rows <= 2 else orginal_table_rows - 2
+        # Convert the table content to column names and row arrays once
+        columns, rows = normalize_writer_table_content(table_data.get("content", []))
         # If there is no data to fill, skip to the next table
-        if not table_data or len(table_data.get("content", [])) == 0:
+        if len(rows) == 0:
             continue
         # Create a mapping of column headers to their respective column names
         columns_header_map = generate_writer_table_columns_map(table)
         # Insert empty rows if needed
-        table = insert_writer_table_rows_before_footer(
-            table, len(table_data.get("content", []))
-        )
+        table = insert_writer_table_rows_before_footer(table, len(rows))
         # Fill the table rows with data
-        table = fill_writer_table_rows(table, table_data, columns_header_map)
+        table = fill_writer_table_rows(table, columns, rows, columns_header_map)
         # Fill the footer placeholder if exists
         table = fill_writer_table_footer(table, table_data, footer_rows)
     return document
 
 
+def normalize_writer_table_content(content) -> tuple[list, list]:
+    """
+    Returns the column names and row arrays of a writer table content.
+
+    Columnar content ({"columns": [...], "rows": [[...]]}) is returned as is, while
+    row objects are converted once so the fill loop does no per cell key lookups.
+    """
+    if isinstance(content, dict):
+        return content.get("columns", []), content.get("rows", [])
+    # Keep the column order in which the names first appear
+    columns = list(dict.fromkeys(key for data_row in content for key in data_row))
+    rows = [[data_row.get(column, "") for column in columns] for data_row in content]
+    return columns, rows
+
+
 def generate_writer_table_columns_map(table) -> dict:
     """Generates a mapping of column headers to their respective column names."""
     # Get all columns in the table
@@ -129,23 +186,49 @@ def generate_writer_table_columns_map(table) -> dict:
     return columns_header_map
 
 
-def fill_writer_table_rows(table, table_data: dict, columns_header_map: dict):
-    """Fills the rows of a writer table with the provided data."""
+def fill_writer_table_rows(
+    table, columns: list, rows: list, columns_header_map: dict
+):
+    """Fills the rows of a writer table with the provided data in a single block write."""
     # Get existing rows in the table
-    rows = table.getRows()
-    existing_row_count = rows.getCount()
-    # Get data rows to be filled
-    data_rows = table_data.get("data", [])
+    table_rows = table.getRows()
+    existing_row_count = table_rows.getCount()
     # Add new rows if there are more data rows than existing rows
-    if len(data_rows) > existing_row_count - 1:
-        rows_to_add = len(data_rows) - (existing_row_count - 1)
-        rows.insertByIndex(existing_row_count, rows_to_add)
-    # Fill the table with data
-    for row_index, data_row in enumerate(data_rows):
-        for column_header, cell_name in columns_header_map.items():
-            cell = table.getCellByName(cell_name + str(row_index + 2))
-            cell_value = data_row.get(column_header, "")
-            cell.String = str(cell_value)
+    if len(rows) > existing_row_count - 1:
+        rows_to_add = len(rows) - (existing_row_count - 1)
+        table_rows.insertByIndex(existing_row_count, rows_to_add)
+    # Map every table column, from A to the last header, to its index in the data rows
+    headers_by_cell_name = {
+        cell_name: column_header
+        for column_header, cell_name in columns_header_map.items()
+    }
+    if not headers_by_cell_name:
+        return table
+    last_cell_name = max(headers_by_cell_name)
+    data_indexes = {column: index for index, column in enumerate(columns)}
+    column_indexes = [
+        data_indexes.get(headers_by_cell_name.get(chr(ord("A") + column_index)))
+        for column_index in range(ord(last_cell_name) - ord("A") + 1)
+    ]
+    width = len(column_indexes)
+    if column_indexes == list(range(width)):
+        # The data columns already match the table columns, only pad short rows
+        data_array = tuple(
+            tuple(data_row[:width]) + ("",) * (width - len(data_row))
+            for data_row in rows
+        )
+    else:
+        # Reorder the data columns and blank the table columns without data
+        data_array = tuple(
+            tuple(
+                data_row[index] if index is not None and index < len(data_row) else ""
+                for index in column_indexes
+            )
+            for data_row in rows
+        )
+    # Write all data rows below the header in one call
+    cell_range = table.getCellRangeByName(f"A2:{last_cell_name}{len(rows) + 1}")
+    cell_range.setDataArray(data_array)
     return table
 
 
@@ -269,94 +352,73 @@ def open_template(libreoffice: any, file_name: str, template_folder: str):
     args = [create_prop("Hidden", True)]
     template_path = pathlib.Path(template_folder + file_name)
     # Create the document URL from the template path
-    url = create_document_url(template_path)
+    url = create_document_url(str(template_path))
     # Load and return the document
-    return libreoffice.loadComponentFromURL(url, "_blank", 0, args)
+    return libreoffice.loadComponentFromURL(url, "_blank", 0, tuple(args))
 
 
-def replace_writer_images(document, images_data, temp_folder):
-    if images_data is None:
-        return document
-    # Creater a Graphic Query provider to create new images
-    component_context = uno.getComponentContext()
-    query_provider = component_context.ServiceManager.createInstanceWithContext(
+def prewarm_template(libreoffice: any, file_name: str, template_folder: str):
+    """Opens and closes a template so its file, fonts and images are cached by soffice."""
+    document = open_template(libreoffice, file_name, template_folder)
+    # Reading the page count forces the layout so fonts and linked images are loaded
+    document.getCurrentController().getPropertyValue("PageCount")
+    document.close(True)
+
+
+def create_graphic_provider(component_context):
+    """Creates a Graphic Query provider of the soffice instance used to import new images."""
+    return component_context.ServiceManager.createInstanceWithContext(
         "com.sun.star.graphic.GraphicProvider", component_context
     )
+
+
+def import_graphic(component_context, query_provider, base64_string: str) -> tuple:
+    """
+    Decodes a base64 image and imports it from memory into the soffice instance
+    owning the component context.
+
+    Returns:
+        tuple: The imported graphic and the decoded size in bytes.
+    """
+    # Decode the base64 string
+    file_data = base64.b64decode(base64_string)
+    # Wrap the bytes in an input stream so no temporary file is written
+    input_stream = component_context.ServiceManager.createInstanceWithArgumentsAndContext(
+        "com.sun.star.io.SequenceInputStream",
+        (uno.ByteSequence(file_data),),
+        component_context,
+    )
+    prop = create_prop("InputStream", input_stream)
+    return query_provider.queryGraphic((prop,)), len(file_data)
+
+
+def replace_writer_images(document, images_data, graphic_cache):
+    if images_data is None:
+        return document
     # Get a list of all graphics in the writer document
     images = document.getGraphicObjects()
     # Get a list of all images name
     image_names = images.getElementNames()
+    # The Graphic Query provider is only needed when an image is not cached yet
+    component_context = graphic_cache.component_context
+    query_provider = None
+
+    def import_missing_graphic(base64_string: str) -> tuple:
+        nonlocal query_provider
+        if query_provider is None:
+            query_provider = create_graphic_provider(component_context)
+        return import_graphic(component_context, query_provider, base64_string)
+
     # Loop throught list of images to be changed names
     for image_name in images_data.keys():
         # If one of the images in the document has a matching name then proceed with changing the images
         if image_name in image_names:
             # Get image object in the document
             image = images.getByName(image_name)
-            # Create a temporary image file
-            temp_image_url = base64_string_to_file(temp_folder, images_data[image_name])
-            # Create a new image object
-            prop = create_prop()
-            prop.Name = "URL"
-            prop.Value = temp_image_url
-            new_image = query_provider.queryGraphic((prop,))
+            # Reuse the graphic imported by an earlier render, decoding it only on a miss
+            new_image = graphic_cache.get_or_import(
+                images_data[image_name], import_missing_graphic
+            )
             # Replace the value of the current image object with the new one
             image.Graphic = new_image
     return document
-
-
-def base64_string_to_file(file_path: str, base64_string: str):
-    """
-    Convert a base64 encoded string to a file.
-
-    Args:
-        base64_string (str): The base64 encoded string.
-
-    Returns:
-        str: file path.
-    """
-    # Decode the base64 string
-    file_data = base64.b64decode(base64_string)
-    # Determine the file extension
-    file_extension = determine_mime_extension(base64_string)
-    # Create a unique file path
-    file_path_obj = pathlib.Path(file_path + uuid.uuid4() + file_extension)
-    try:
-        # Create directories if they do not exist
-        file_path_obj.parent.mkdir(parents=True, exist_ok=True)
-        # Write the decoded data to the file
-        with open(file_path_obj, "wb") as file:
-            file.write(file_data)
-        # Return the file path as a string
-        return str(file_path_obj)
-    except Exception as e:
-        raise e
-
-
-def determine_mime_extension(base64_string):
-    """
-    Determine the MIME type and file extension from a base64 encoded string.
-
-    Args:
-        base64_string (str): The base64 encoded string.
-    Returns:
-        str: The file extension corresponding to the MIME type.
-    """
-    # Decode base64 string to bytes
-    file_bytes = base64.b64decode(base64_string)
-    # Grap the first few bytes to identify the file type
-    header = file_bytes[:12]
-    # Identify the file type based on the header bytes and return extension
-    if header.startswith(b"\x89PNG\r\n\x1a\n"):
-        return ".png"
-    elif header.startswith(b"\xff\xd8\xff"):
-        return ".jpg"
-    elif header.startswith(b"GIF87a") or header.startswith(b"GIF89a"):
-        return ".gif"
-    elif header.startswith(b"BM"):
-        return ".bmp"
-    elif header.startswith(b"II*\x00") or header.startswith(b"MM\x00*"):
-        return ".tiff"
-    elif header.startswith(b"RIFF") and b"WEBP" in header:
-        return ".webp"
-    else:
-        return ""
@@ -0,0 +1,57 @@
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+import time
+from typing import Optional
+
+
+class SharedFileCache:
+    """
+    JSON cache stored as one file per key, so every worker process on the host reuses
+    entries fetched by the others instead of fetching them again. Values are decoded
+    per read and not retained in the process. A time to live of zero or less disables
+    the cache.
+    """
+
+    def __init__(self, folder: str, ttl_seconds: float):
+        self.folder = pathlib.Path(folder)
+        self.ttl_seconds = ttl_seconds
+
+    @property
+    def enabled(self) -> bool:
+        """Whether entries are kept at all."""
+        return self.ttl_seconds > 0
+
+    def _path(self, key: str) -> pathlib.Path:
+        """Returns the cache file path of a key."""
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.folder / f"{digest}.json"
+
+    def get(self, key: str) -> Optional[dict]:
+        """Returns the cached value of a key or None if it is missing or expired."""
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            # Treat entries older than the time to live as missing
+            if time.time() - path.stat().st_mtime > self.ttl_seconds:
+                return None
+            return json.loads(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, value: dict):
+        """Atomically stores the value of a key so readers never see a partial file."""
+        if not self.enabled:
+            return
+        self.folder.mkdir(parents=True, exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.folder)
+        try:
+            with os.fdopen(file_descriptor, "w") as file:
+                json.dump(value, file, default=str)
+            os.replace(temporary_path, self._path(key))
+        except Exception:
+            pathlib.Path(temporary_path).unlink(missing_ok=True)
+            raise
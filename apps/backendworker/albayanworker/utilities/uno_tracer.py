@@ -0,0 +1,171 @@
+import json
+import pathlib
+import sys
+import threading
+import time
+from collections import defaultdict
+
+# Only frames from this package are kept in call sites and collapsed stacks
+TRACED_PACKAGE = "albayanworker"
+
+
+def is_uno_object(value) -> bool:
+    """Returns whether the value is a proxy of a remote UNO object."""
+    return type(value).__name__ == "pyuno"
+
+
+class UnoCallProfile:
+    """Counts and times the UNO calls made while rendering a single report."""
+
+    def __init__(self, report_id: str):
+        self.report_id = report_id
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        # (call site, method) -> [calls, total seconds, max seconds]
+        self.call_sites = defaultdict(lambda: [0, 0.0, 0.0])
+        # Collapsed stack -> total microseconds
+        self.collapsed_stacks = defaultdict(int)
+
+    @staticmethod
+    def _caller_stack() -> list[str]:
+        """Returns the package frames of the current stack, outermost first."""
+        stack = []
+        frame = sys._getframe(1)
+        while frame is not None:
+            module_name = frame.f_globals.get("__name__", "")
+            if module_name.startswith(TRACED_PACKAGE) and module_name != __name__:
+                stack.append(f"{module_name}.{frame.f_code.co_name}:{frame.f_lineno}")
+            frame = frame.f_back
+        return list(reversed(stack))
+
+    def record(self, method: str, elapsed: float):
+        """Records one UNO call made from the current stack."""
+        stack = self._caller_stack()
+        call_site = stack[-1] if stack else "<unknown>"
+        with self._lock:
+            entry = self.call_sites[(call_site, method)]
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = max(entry[2], elapsed)
+            # Drop line numbers so the flamegraph merges calls from the same function
+            frames = [frame.rsplit(":", 1)[0] for frame in stack]
+            self.collapsed_stacks[";".join(frames + [method])] += int(elapsed * 1e6)
+
+    def as_dict(self) -> dict:
+        """Returns the profile aggregated by call site and method, slowest first."""
+        call_sites = [
+            {
+                "call_site": call_site,
+                "method": method,
+                "calls": calls,
+                "total_seconds": total,
+                "max_seconds": maximum,
+            }
+            for (call_site, method), (calls, total, maximum) in self.call_sites.items()
+        ]
+        call_sites.sort(key=lambda entry: entry["total_seconds"], reverse=True)
+        return {
+            "report_id": self.report_id,
+            "wall_seconds": time.perf_counter() - self.started,
+            "total_calls": sum(entry["calls"] for entry in call_sites),
+            "total_uno_seconds": sum(entry["total_seconds"] for entry in call_sites),
+            "call_sites": call_sites,
+        }
+
+    def dump(self, output_folder: str) -> list[str]:
+        """Writes the JSON profile and the flamegraph collapsed stacks, returning their paths."""
+        folder = pathlib.Path(output_folder)
+        folder.mkdir(parents=True, exist_ok=True)
+        json_path = folder / f"{self.report_id}.uno-profile.json"
+        collapsed_path = folder / f"{self.report_id}.uno-profile.folded"
+        with open(json_path, "w") as file:
+            json.dump(self.as_dict(), file, indent=2)
+        with open(collapsed_path, "w") as file:
+            for stack, microseconds in sorted(self.collapsed_stacks.items()):
+                file.write(f"{stack} {microseconds}\n")
+        return [str(json_path), str(collapsed_path)]
+
+
+def unwrap(value):
+    """Returns the underlying UNO object of a traced proxy, recursing into tuples and lists."""
+    if isinstance(value, TracedUnoProxy):
+        return object.__getattribute__(value, "_target")
+    if isinstance(value, tuple):
+        return tuple(unwrap(item) for item in value)
+    if isinstance(value, list):
+        return [unwrap(item) for item in value]
+    return value
+
+
+def wrap(value, profile: UnoCallProfile):
+    """Wraps UNO objects returned by a traced call so their calls are traced too."""
+    if is_uno_object(value):
+        return TracedUnoProxy(value, profile)
+    if isinstance(value, tuple) and any(is_uno_object(item) for item in value):
+        return tuple(wrap(item, profile) for item in value)
+    return value
+
+
+class TracedUnoProxy:
+    """Proxy over a UNO object recording every remote method call and property access."""
+
+    __slots__ = ("_target", "_profile")
+
+    def __init__(self, target, profile: UnoCallProfile):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_profile", profile)
+
+    def __getattr__(self, name: str):
+        target = object.__getattribute__(self, "_target")
+        profile = object.__getattribute__(self, "_profile")
+        started = time.perf_counter()
+        attribute = getattr(target, name)
+        if not callable(attribute):
+            # Property reads are remote calls of their own
+            profile.record(f"get {name}", time.perf_counter() - started)
+            return wrap(attribute, profile)
+
+        def traced_call(*args, **kwargs):
+            call_started = time.perf_counter()
+            try:
+                result = attribute(*unwrap(args), **kwargs)
+            finally:
+                profile.record(name, time.perf_counter() - call_started)
+            return wrap(result, profile)
+
+        return traced_call
+
+    def __setattr__(self, name: str, value):
+        target = object.__getattribute__(self, "_target")
+        profile = object.__getattribute__(self, "_profile")
+        started = time.perf_counter()
+        try:
+            setattr(target, name, unwrap(value))
+        finally:
+            profile.record(f"set {name}", time.perf_counter() - started)
+
+    def __iter__(self):
+        profile = object.__getattribute__(self, "_profile")
+        for item in object.__getattribute__(self, "_target"):
+            yield wrap(item, profile)
+
+    def __len__(self):
+        return len(object.__getattribute__(self, "_target"))
+
+    def __contains__(self, item):
+        return unwrap(item) in object.__getattribute__(self, "_target")
+
+    def __getitem__(self, key):
+        profile = object.__getattribute__(self, "_profile")
+        return wrap(object.__getattribute__(self, "_target")[key], profile)
+
+    def __eq__(self, other):
+        return object.__getattribute__(self, "_target") == unwrap(other)
+
+    def __hash__(self):
+        return hash(object.__getattribute__(self, "_target"))
+
+
+def trace(uno_object, profile: UnoCallProfile):
+    """Wraps a Desktop or document so every UNO call made through it is recorded in the profile."""
+    return TracedUnoProxy(uno_object, profile)
@@ -0,0 +1,55 @@
+import asyncio
+import random
+import pytest
+from albayanworker.schedulers.adaptive_limiter import AdaptiveConcurrencyLimiter
+
+
+async def render(limiter, clock, latency_key, latency, error=None):
+    async with limiter.track(latency_key):
+        clock.now += latency
+        if error is not None:
+            raise error
+
+
+def test_mixed_small_and_large_renders_do_not_look_congested(clock):
+    async def scenario():
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, clock=clock)
+        generator = random.Random(7)
+        for _ in range(5000):
+            if generator.random() < 0.8:
+                await render(limiter, clock, "invoice:3", generator.uniform(0.18, 0.22))
+            else:
+                await render(limiter, clock, "statement:12", generator.uniform(4.5, 5.5))
+        assert limiter.decreases == 0
+        assert limiter.current_limit() == 8
+
+    asyncio.run(scenario())
+
+
+def test_latency_growth_of_the_same_render_backs_off(clock):
+    async def scenario():
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, clock=clock)
+        for _ in range(20):
+            await render(limiter, clock, "invoice:3", 0.2)
+        for _ in range(20):
+            await render(limiter, clock, "invoice:3", 1.0)
+        assert limiter.decreases > 0
+        assert limiter.current_limit() < 8
+
+    asyncio.run(scenario())
+
+
+def test_only_overload_errors_back_off(clock):
+    async def scenario():
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, clock=clock)
+        for _ in range(10):
+            with pytest.raises(ValueError):
+                await render(limiter, clock, "invoice:3", 0.2, ValueError("bad data"))
+        assert limiter.errors == 0
+        assert limiter.current_limit() == 8
+        with pytest.raises(TimeoutError):
+            await render(limiter, clock, "invoice:3", 0.2, TimeoutError())
+        assert limiter.errors == 1
+        assert limiter.current_limit() == 7
+
+    asyncio.run(scenario())
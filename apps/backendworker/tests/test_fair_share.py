@@ -0,0 +1,198 @@
+import asyncio
+import heapq
+import itertools
+import pytest
+from albayanworker.schedulers.fair_share import AdmissionRejected, FairShareScheduler
+from albayanworker.schemas.document_schemas import ReportPriority
+
+INTERACTIVE = ReportPriority.INTERACTIVE
+BULK = ReportPriority.BULK
+
+
+async def settle():
+    """Lets woken waiters run before the simulated clock moves on."""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class Simulation:
+    """Discrete event simulation of renders of fixed duration on a fair share scheduler."""
+
+    def __init__(self, clock, scheduler: FairShareScheduler):
+        self.clock = clock
+        self.scheduler = scheduler
+        self.events = []
+        self.sequence = itertools.count()
+        self.tasks = []
+        # (tenant, priority, arrival, dispatch) of every dispatched request
+        self.dispatched = []
+        self.max_tenant_in_flight = {}
+
+    def submit(self, arrival: float, tenant_id: str, priority: ReportPriority, duration: float):
+        heapq.heappush(
+            self.events,
+            (arrival, next(self.sequence), "arrival", (tenant_id, priority, duration)),
+        )
+
+    async def request(self, tenant_id, priority, duration):
+        arrival = self.clock.now
+        await self.scheduler.acquire(tenant_id, priority)
+        self.dispatched.append((tenant_id, priority, arrival, self.clock.now))
+        heapq.heappush(
+            self.events,
+            (self.clock.now + duration, next(self.sequence), "release", (tenant_id, priority)),
+        )
+
+    async def run(self, until=lambda simulation: False):
+        while self.events and not until(self):
+            self.clock.now = self.events[0][0]
+            # Process every event due now before letting waiters run
+            while self.events and self.events[0][0] == self.clock.now:
+                _, _, kind, payload = heapq.heappop(self.events)
+                if kind == "arrival":
+                    self.tasks.append(asyncio.create_task(self.request(*payload)))
+                else:
+                    self.scheduler.release(*payload)
+            await settle()
+            for tenant_id, statistics in self.scheduler.tenants.items():
+                self.max_tenant_in_flight[tenant_id] = max(
+                    self.max_tenant_in_flight.get(tenant_id, 0), statistics.in_flight
+                )
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    def waits(self, tenant_id: str) -> list[float]:
+        return [
+            dispatch - arrival
+            for dispatched_tenant, _, arrival, dispatch in self.dispatched
+            if dispatched_tenant == tenant_id
+        ]
+
+
+def create_scheduler(clock, capacity, **options) -> FairShareScheduler:
+    options.setdefault("class_weights", {INTERACTIVE: 8.0, BULK: 1.0})
+    options.setdefault("queue_timeout", None)
+    return FairShareScheduler(capacity=lambda: capacity, clock=clock, **options)
+
+
+def test_interactive_wait_stays_flat_under_bulk_backlog(clock):
+    async def scenario():
+        scheduler = create_scheduler(
+            clock, capacity=4, interactive_reserve=1, max_queue=30000
+        )
+        simulation = Simulation(clock, scheduler)
+        for _ in range(20000):
+            simulation.submit(0.0, "batch", BULK, 1.0)
+        for index in range(100):
+            simulation.submit(0.5 + 5 * index, "web", INTERACTIVE, 1.0)
+        await simulation.run(until=lambda simulation: len(simulation.waits("web")) == 100)
+        interactive_waits = simulation.waits("web")
+        assert len(interactive_waits) == 100
+        # Interactive renders never wait behind the bulk backlog
+        assert max(interactive_waits) <= 1.0
+        # The bulk backlog was still far from drained
+        assert len(simulation.waits("batch")) < 2000
+
+    asyncio.run(scenario())
+
+
+def test_tenant_quota_caps_concurrency(clock):
+    async def scenario():
+        scheduler = create_scheduler(clock, capacity=8, tenant_quota=2, interactive_reserve=0)
+        simulation = Simulation(clock, scheduler)
+        for tenant_id in ("a", "b"):
+            for _ in range(10):
+                simulation.submit(0.0, tenant_id, BULK, 1.0)
+        await simulation.run()
+        assert simulation.max_tenant_in_flight == {"a": 2, "b": 2}
+        assert len(simulation.dispatched) == 20
+
+    asyncio.run(scenario())
+
+
+def low_weight_dispatch_time(clock, aging_rate: float) -> float:
+    async def scenario():
+        clock.now = 0.0
+        scheduler = create_scheduler(
+            clock,
+            capacity=1,
+            class_weights={INTERACTIVE: 1.0, BULK: 1.0},
+            tenant_weights={"low": 0.01},
+            interactive_reserve=0,
+            aging_rate=aging_rate,
+            aging_limit=100.0,
+        )
+        simulation = Simulation(clock, scheduler)
+        # A heavy tenant keeps a growing backlog of newer requests
+        for index in range(400):
+            simulation.submit(index * 0.5, "high", BULK, 1.0)
+        simulation.submit(0.1, "low", BULK, 1.0)
+        await simulation.run(until=lambda simulation: simulation.waits("low"))
+        return simulation.waits("low")[0]
+
+    return asyncio.run(scenario())
+
+
+def test_aging_dispatches_low_weight_flows_earlier(clock):
+    without_aging = low_weight_dispatch_time(clock, aging_rate=0.0)
+    with_aging = low_weight_dispatch_time(clock, aging_rate=2.0)
+    assert without_aging >= 90
+    assert with_aging < without_aging * 0.6
+
+
+def test_cancelled_waiter_returns_its_queue_entry(clock):
+    async def scenario():
+        scheduler = create_scheduler(clock, capacity=1)
+        await scheduler.acquire("a", INTERACTIVE)
+        waiter = asyncio.create_task(scheduler.acquire("b", INTERACTIVE))
+        await settle()
+        assert scheduler.queued == 1
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert scheduler.queued == 0
+        assert scheduler.tenants["b"].queued == 0
+        scheduler.release("a", INTERACTIVE)
+        assert scheduler.in_flight == 0
+        assert scheduler.tenants["b"].dispatched == 0
+
+    asyncio.run(scenario())
+
+
+def test_waiter_cancelled_after_dispatch_returns_its_slot(clock):
+    async def scenario():
+        scheduler = create_scheduler(clock, capacity=1)
+        await scheduler.acquire("a", INTERACTIVE)
+        waiter = asyncio.create_task(scheduler.acquire("b", INTERACTIVE))
+        await settle()
+        # The slot is handed over, then the waiter is cancelled before it resumes
+        scheduler.release("a", INTERACTIVE)
+        assert scheduler.in_flight == 1
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert scheduler.in_flight == 0
+        assert scheduler.tenants["b"].in_flight == 0
+        await asyncio.wait_for(scheduler.acquire("c", INTERACTIVE), 1)
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_and_queue_timeout_shed_requests(clock):
+    async def scenario():
+        scheduler = create_scheduler(
+            clock, capacity=1, max_queue=1, queue_timeout=0.01
+        )
+        await scheduler.acquire("a", INTERACTIVE)
+        waiter = asyncio.create_task(scheduler.acquire("b", INTERACTIVE))
+        await settle()
+        with pytest.raises(AdmissionRejected):
+            await scheduler.acquire("c", INTERACTIVE)
+        with pytest.raises(AdmissionRejected):
+            await waiter
+        statistics = scheduler.statistics()
+        assert statistics["queued"] == 0
+        assert statistics["rejected"] == 2
+        assert statistics["timed_out"] == 1
+        assert statistics["tenants"]["b"]["timed_out"] == 1
+
+    asyncio.run(scenario())
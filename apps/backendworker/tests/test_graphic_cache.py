@@ -0,0 +1,60 @@
+import threading
+import pytest
+from albayanworker.utilities.graphic_cache import GraphicCache
+
+
+def test_concurrent_misses_import_the_image_once():
+    graphic_cache = GraphicCache(max_bytes=1024)
+    import_started = threading.Event()
+    release_import = threading.Event()
+    imports = []
+
+    def slow_import(base64_string: str) -> tuple:
+        imports.append(base64_string)
+        import_started.set()
+        release_import.wait(5)
+        return f"graphic:{base64_string}", 10
+
+    results = []
+    renders = [
+        threading.Thread(
+            target=lambda: results.append(graphic_cache.get_or_import("aGVsbG8=", slow_import))
+        )
+        for _ in range(4)
+    ]
+    renders[0].start()
+    import_started.wait(5)
+    for render in renders[1:]:
+        render.start()
+    release_import.set()
+    for render in renders:
+        render.join(5)
+    assert imports == ["aGVsbG8="]
+    assert results == ["graphic:aGVsbG8="] * 4
+    statistics = graphic_cache.statistics()
+    assert statistics["misses"] == 1
+    assert statistics["hits"] == 3
+    assert statistics["importing"] == 0
+
+
+def test_failed_import_lets_the_next_render_retry():
+    graphic_cache = GraphicCache(max_bytes=1024)
+
+    def failing_import(base64_string: str) -> tuple:
+        raise RuntimeError("import failed")
+
+    with pytest.raises(RuntimeError):
+        graphic_cache.get_or_import("aGVsbG8=", failing_import)
+    graphic = graphic_cache.get_or_import("aGVsbG8=", lambda value: ("graphic", 10))
+    assert graphic == "graphic"
+    assert graphic_cache.statistics()["importing"] == 0
+
+
+def test_least_recently_used_graphics_are_evicted_over_budget():
+    graphic_cache = GraphicCache(max_bytes=20)
+    for image in ("a", "b", "c"):
+        graphic_cache.get_or_import(image, lambda value: (f"graphic:{value}", 10))
+    statistics = graphic_cache.statistics()
+    assert statistics["entries"] == 2
+    assert statistics["bytes"] == 20
+    assert statistics["evictions"] == 1
@@ -0,0 +1,30 @@
+import pytest
+
+# The helpers live next to the pyuno based utilities
+pytest.importorskip("uno")
+from albayanworker.utilities.libreoffice_utilites import (  # noqa: E402
+    is_libreoffice_connection_failure,
+    is_libreoffice_overload,
+)
+
+
+def uno_exception(name: str, message: str = "") -> Exception:
+    """Builds an exception class named like the pyuno generated UNO exceptions."""
+    base = type("com.sun.star.uno.RuntimeException", (Exception,), {})
+    if name == "RuntimeException":
+        return base(message)
+    return type(f"com.sun.star.lang.{name}", (base,), {})(message)
+
+
+def test_bridge_failures_count_as_overload():
+    assert is_libreoffice_overload(uno_exception("DisposedException"))
+    assert is_libreoffice_overload(uno_exception("RuntimeException", "Binary URP bridge disposed"))
+    assert is_libreoffice_overload(TimeoutError())
+    assert is_libreoffice_overload(ConnectionResetError())
+
+
+def test_template_and_data_errors_do_not_count_as_overload():
+    excep = uno_exception("RuntimeException", "setDataArray: range has merged cells")
+    assert not is_libreoffice_connection_failure(excep)
+    assert not is_libreoffice_overload(excep)
+    assert not is_libreoffice_overload(ValueError("bad report data"))
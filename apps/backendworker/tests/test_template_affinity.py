@@ -0,0 +1,139 @@
+import asyncio
+from albayanworker.schedulers.template_affinity import TemplateAffinityScheduler
+
+TEMPLATE_IDS = [f"template-{index}" for index in range(500)]
+
+
+async def create_scheduler(instance_ids, instance_capacity=1):
+    scheduler = TemplateAffinityScheduler(instance_capacity)
+    for instance_id in instance_ids:
+        await scheduler.add_instance(instance_id)
+    return scheduler
+
+
+def preferred_map(scheduler):
+    return {
+        template_id: scheduler.preferred_instances(template_id)[0]
+        for template_id in TEMPLATE_IDS
+    }
+
+
+def test_removing_an_instance_only_moves_its_templates():
+    async def scenario():
+        scheduler = await create_scheduler(["a:1", "b:2", "c:3"])
+        before = preferred_map(scheduler)
+        await scheduler.remove_instance("b:2")
+        after = preferred_map(scheduler)
+        for template_id in TEMPLATE_IDS:
+            if before[template_id] != "b:2":
+                assert after[template_id] == before[template_id]
+            else:
+                assert after[template_id] in ("a:1", "c:3")
+        # Adding the instance back restores the original routing
+        await scheduler.add_instance("b:2")
+        assert preferred_map(scheduler) == before
+
+    asyncio.run(scenario())
+
+
+def test_adding_an_instance_moves_a_fraction_of_templates():
+    async def scenario():
+        scheduler = await create_scheduler(["a:1", "b:2", "c:3"])
+        before = preferred_map(scheduler)
+        await scheduler.add_instance("d:4")
+        after = preferred_map(scheduler)
+        moved = [t for t in TEMPLATE_IDS if before[t] != after[t]]
+        # Only templates now owned by the new instance move
+        assert all(after[template_id] == "d:4" for template_id in moved)
+        assert 0 < len(moved) < len(TEMPLATE_IDS) / 2
+
+    asyncio.run(scenario())
+
+
+def test_same_template_hits_the_warm_instance():
+    async def scenario():
+        scheduler = await create_scheduler(["a:1", "b:2", "c:3"])
+        for _ in range(3):
+            async with scheduler.slot("template-1"):
+                pass
+        statistics = scheduler.statistics()
+        assert sum(item["affinity_hits"] for item in statistics.values()) == 2
+        assert sum(item["affinity_misses"] for item in statistics.values()) == 1
+
+    asyncio.run(scenario())
+
+
+def test_spill_prefers_instance_where_template_is_warm():
+    async def scenario():
+        scheduler = await create_scheduler(["a:1", "b:2", "c:3"])
+        preferred, second, third = scheduler.preferred_instances("template-1")
+        other_template = next(
+            template_id
+            for template_id in TEMPLATE_IDS
+            if scheduler.preferred_instances(template_id)[0] == second
+        )
+        # Saturate the first two instances so template-1 warms up on the third
+        assert await scheduler.acquire("template-1") == preferred
+        assert await scheduler.acquire(other_template) == second
+        assert await scheduler.acquire("template-1") == third
+        await scheduler.release(third)
+        await scheduler.release(second)
+        # With the preferred instance saturated the warm third one wins over the idle second
+        assert await scheduler.acquire("template-1") == third
+        statistics = scheduler.statistics()[third]
+        assert statistics["spilled_in"] == 2
+        assert statistics["affinity_hits"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_leaves_queue_accounting_clean():
+    async def scenario():
+        scheduler = await create_scheduler(["a:1"])
+        instance_id = await scheduler.acquire("template-1")
+        waiter = asyncio.create_task(scheduler.acquire("template-1"))
+        await asyncio.sleep(0)
+        assert scheduler.statistics()["a:1"]["queued"] == 1
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        statistics = scheduler.statistics()["a:1"]
+        assert statistics["queued"] == 0
+        assert statistics["in_flight"] == 1
+        # The slot is still usable by the next request once released
+        await scheduler.release(instance_id)
+        assert await scheduler.acquire("template-2") == "a:1"
+
+    asyncio.run(scenario())
+
+
+def test_waiter_moves_to_remaining_instance_when_its_instance_is_removed():
+    async def scenario():
+        scheduler = await create_scheduler(["a:1", "b:2"])
+        preferred, other = scheduler.preferred_instances("template-1")
+        await scheduler.acquire("template-1")
+        await scheduler.acquire("template-1")
+        waiter = asyncio.create_task(scheduler.acquire("template-1"))
+        await asyncio.sleep(0)
+        await scheduler.remove_instance(preferred)
+        # Freeing the other instance lets the waiter through
+        await scheduler.release(other)
+        assert await asyncio.wait_for(waiter, 1) == other
+        assert scheduler.total_capacity() == 1
+        assert scheduler.statistics()[preferred]["available"] is False
+
+    asyncio.run(scenario())
+
+
+def test_recycled_instance_rejoins_without_warm_templates():
+    async def scenario():
+        scheduler = await create_scheduler(["a:1"])
+        async with scheduler.slot("template-1"):
+            pass
+        await scheduler.remove_instance("a:1")
+        await scheduler.add_instance("a:1")
+        statistics = scheduler.statistics()["a:1"]
+        assert statistics["recycled"] == 1
+        assert statistics["warm_templates"] == 0
+        assert statistics["available"] is True
+
+    asyncio.run(scenario())
@@ -0,0 +1,120 @@
+import json
+import textwrap
+from albayanworker.utilities import uno_tracer
+
+
+def make_pyuno_class():
+    """Stand in for pyuno proxies, recognised by their class name."""
+
+    def __init__(self, name):
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "received", [])
+        object.__setattr__(self, "children", [])
+
+    def getByName(self, name):
+        child = pyuno(name)
+        self.children.append(child)
+        return child
+
+    def getPair(self):
+        return (pyuno("first"), pyuno("second"))
+
+    def setDataArray(self, rows):
+        self.received.append(rows)
+
+    def __iter__(self):
+        return iter(self.children)
+
+    def __contains__(self, item):
+        return item in self.children
+
+    pyuno = type(
+        "pyuno",
+        (),
+        {
+            "__init__": __init__,
+            "getByName": getByName,
+            "getPair": getPair,
+            "setDataArray": setDataArray,
+            "__iter__": __iter__,
+            "__contains__": __contains__,
+        },
+    )
+    return pyuno
+
+
+def render_in_package(document, profile):
+    """Runs calls from a function attributed to the albayanworker package."""
+    namespace = {"__name__": "albayanworker.fake_render"}
+    exec(
+        textwrap.dedent(
+            """
+            def fill(document):
+                table = document.getByName("Table1")
+                table.String = "Total"
+                table.setDataArray(((document.getByName("cell"), "text"),))
+                return table.name
+            """
+        ),
+        namespace,
+    )
+    return namespace["fill"](uno_tracer.trace(document, profile))
+
+
+def test_calls_properties_and_arguments_are_traced_and_unwrapped():
+    pyuno = make_pyuno_class()
+    document = pyuno("document")
+    profile = uno_tracer.UnoCallProfile("report-1")
+    assert render_in_package(document, profile) == "Table1"
+    table, cell = document.children
+    # The target receives the raw UNO objects, not the proxies
+    assert table.String == "Total"
+    assert table.received == [((cell, "text"),)]
+    assert type(table.received[0][0][0]) is pyuno
+    calls = {}
+    for entry in profile.as_dict()["call_sites"]:
+        calls[entry["method"]] = calls.get(entry["method"], 0) + entry["calls"]
+    assert calls == {"getByName": 2, "set String": 1, "setDataArray": 1, "get name": 1}
+    call_sites = {entry["call_site"] for entry in profile.as_dict()["call_sites"]}
+    # Calls are attributed to the package line that made them, not to the tracer
+    assert {call_site.rsplit(":", 1)[0] for call_site in call_sites} == {
+        "albayanworker.fake_render.fill"
+    }
+    assert len(call_sites) == 4
+
+
+def test_returned_tuples_iteration_and_membership_are_proxied():
+    pyuno = make_pyuno_class()
+    document = pyuno("document")
+    profile = uno_tracer.UnoCallProfile("report-2")
+    traced = uno_tracer.trace(document, profile)
+    first, second = traced.getPair()
+    assert isinstance(first, uno_tracer.TracedUnoProxy)
+    assert first.name == "first"
+    child = traced.getByName("child")
+    assert [item for item in traced] == [child]
+    assert all(isinstance(item, uno_tracer.TracedUnoProxy) for item in traced)
+    assert child in traced
+    assert uno_tracer.unwrap([child, (child, [child])]) == [
+        document.children[0],
+        (document.children[0], [document.children[0]]),
+    ]
+
+
+def test_dump_writes_json_profile_and_folded_stacks(tmp_path):
+    pyuno = make_pyuno_class()
+    profile = uno_tracer.UnoCallProfile("report-3")
+    render_in_package(pyuno("document"), profile)
+    json_path, folded_path = profile.dump(str(tmp_path))
+    with open(json_path) as file:
+        dumped = json.load(file)
+    assert dumped["report_id"] == "report-3"
+    assert dumped["total_calls"] == 5
+    lines = open(folded_path).read().splitlines()
+    assert {line.rsplit(" ", 1)[0] for line in lines} == {
+        "albayanworker.fake_render.fill;getByName",
+        "albayanworker.fake_render.fill;set String",
+        "albayanworker.fake_render.fill;setDataArray",
+        "albayanworker.fake_render.fill;get name",
+    }
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
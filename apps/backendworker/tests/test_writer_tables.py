@@ -0,0 +1,157 @@
+import pytest
+
+# The table helpers live next to the pyuno based utilities
+pytest.importorskip("uno")
+from albayanworker.utilities.libreoffice_utilites import (  # noqa: E402
+    fill_writer_table_rows,
+    generate_writer_table_columns_map,
+    normalize_writer_table_content,
+    writer_fill_tables,
+)
+
+
+class FakeRows:
+    def __init__(self, count: int):
+        self.count = count
+        self.inserted = []
+
+    def getCount(self) -> int:
+        return self.count
+
+    def insertByIndex(self, index: int, count: int):
+        self.inserted.append((index, count))
+        self.count += count
+
+
+class FakeColumns:
+    def __init__(self, count: int):
+        self.count = count
+
+    def getCount(self) -> int:
+        return self.count
+
+
+class FakeCell:
+    def __init__(self, string: str):
+        self.String = string
+
+
+class FakeCellRange:
+    def __init__(self):
+        self.data_array = None
+
+    def setDataArray(self, data_array):
+        self.data_array = data_array
+
+
+class FakeTable:
+    """Writer table with a header row and optional data rows below it."""
+
+    def __init__(self, name: str, headers: list[str], row_count: int = 2):
+        self.name = name
+        self.headers = headers
+        self.rows = FakeRows(row_count)
+        self.ranges = {}
+
+    def getName(self) -> str:
+        return self.name
+
+    def getRows(self) -> FakeRows:
+        return self.rows
+
+    def getColumns(self) -> FakeColumns:
+        return FakeColumns(len(self.headers))
+
+    def getCellByName(self, cell_name: str) -> FakeCell:
+        assert cell_name.endswith("1")
+        return FakeCell(self.headers[ord(cell_name[0]) - ord("A")])
+
+    def getCellRangeByName(self, range_name: str) -> FakeCellRange:
+        self.ranges[range_name] = FakeCellRange()
+        return self.ranges[range_name]
+
+
+class FakeTables(list):
+    def getCount(self) -> int:
+        return len(self)
+
+
+class FakeDocument:
+    def __init__(self, tables: list[FakeTable]):
+        self.tables = FakeTables(tables)
+
+    def getTextTables(self) -> FakeTables:
+        return self.tables
+
+
+def fill(table: FakeTable, columns: list, rows: list) -> dict:
+    fill_writer_table_rows(table, columns, rows, generate_writer_table_columns_map(table))
+    return {name: cell_range.data_array for name, cell_range in table.ranges.items()}
+
+
+def test_row_objects_are_converted_to_row_arrays():
+    columns, rows = normalize_writer_table_content(
+        [{"Item": "Pen", "Qty": "2"}, {"Qty": "5", "Price": "1.5"}]
+    )
+    # Columns keep the order in which they first appear, missing values are blank
+    assert columns == ["Item", "Qty", "Price"]
+    assert rows == [["Pen", "2", ""], ["", "5", "1.5"]]
+
+
+def test_columnar_content_is_returned_as_is():
+    content = {"columns": ["Item", "Qty"], "rows": [["Pen", "2"]]}
+    assert normalize_writer_table_content(content) == (["Item", "Qty"], [["Pen", "2"]])
+    assert normalize_writer_table_content({}) == ([], [])
+
+
+def test_matching_columns_are_written_in_one_block_padded_and_truncated():
+    table = FakeTable("Items", ["Item", "Qty", "Price"])
+    written = fill(table, ["Item", "Qty", "Price"], [["Pen", "2", "1.5", "extra"], ["Ink"]])
+    assert written == {"A2:C3": (("Pen", "2", "1.5"), ("Ink", "", ""))}
+    # One data row existed below the header, the second one is appended
+    assert table.rows.inserted == [(2, 1)]
+
+
+def test_data_columns_are_reordered_to_the_table_headers():
+    table = FakeTable("Items", ["Qty", "Item"])
+    written = fill(table, ["Item", "Qty"], [["Pen", "2"], ["Ink", "5"]])
+    assert written == {"A2:B3": (("2", "Pen"), ("5", "Ink"))}
+
+
+def test_table_columns_without_data_are_blanked():
+    table = FakeTable("Items", ["Item", "Notes", "Qty"])
+    written = fill(table, ["Item", "Qty", "Unused"], [["Pen", "2", "x"], ["Ink"]])
+    assert written == {"A2:C3": (("Pen", "", "2"), ("Ink", "", ""))}
+
+
+def test_range_ends_at_the_last_mapped_header_column():
+    table = FakeTable("Items", ["Item", "", "", "Qty"])
+    columns_header_map = {"Item": "A", "Qty": "D"}
+    fill_writer_table_rows(table, ["Item", "Qty"], [["Pen", "2"]], columns_header_map)
+    assert list(table.ranges) == ["A2:D2"]
+    assert table.ranges["A2:D2"].data_array == (("Pen", "", "", "2"),)
+
+
+def test_table_without_headers_is_left_untouched():
+    table = FakeTable("Items", [])
+    assert fill_writer_table_rows(table, ["Item"], [["Pen"]], {}) is table
+    assert table.ranges == {}
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        [{"Qty": "2", "Item": "Pen"}, {"Item": "Ink", "Qty": "5"}, {"Item": "Pad"}],
+        {"columns": ["Qty", "Item"], "rows": [["2", "Pen"], ["5", "Ink"], ["", "Pad"]]},
+    ],
+)
+def test_both_payload_formats_fill_the_named_table(content):
+    items = FakeTable("Items", ["Item", "Qty"])
+    other = FakeTable("Other", ["Item"])
+    document = FakeDocument([items, other])
+    writer_fill_tables(document, {"writer_tables": [{"table_name": "Items", "content": content}]})
+    assert {name: cell_range.data_array for name, cell_range in items.ranges.items()} == {
+        "A2:B4": (("Pen", "2"), ("Ink", "5"), ("Pad", ""))
+    }
+    assert items.rows.getCount() == 4
+    assert other.ranges == {}
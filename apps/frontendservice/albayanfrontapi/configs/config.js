@@ -15,6 +15,8 @@ const config = {
   WORKER_URL: process.env.WORKER_URL || "http://localhost:8080",
   UPLOAD_FOLDER: process.env.UPLOAD_FOLDER || "/tmp/input",
   REPORT_OUTPUT_FOLDER: process.env.REPORT_OUTPUT_FOLDER || "/tmp/output",
+  // Header identifying the calling tenant, set by the API gateway from the API key
+  TENANT_HEADER: (process.env.TENANT_HEADER || "x-tenant-id").toLowerCase(),
 };
 
 // Export config dictionary
@@ -6,6 +6,7 @@ import {
 } from "../services/database.js";
 import errorResponse from "../utils/errorResponse.utils.js";
 import { createReportFromWorker } from "../services/worker.service.js";
+import { config } from "../configs/config.js";
 
 // Create Report Controller
 const createReport = async (request, response) => {
@@ -14,7 +15,9 @@ const createReport = async (request, response) => {
     const createReportRecord = await createReportService(
       request.params.reportDefinitionId,
       request.body.output_format,
-      request.body.report_data
+      request.body.report_data,
+      request.headers[config.TENANT_HEADER],
+      request.body.priority
     );
     // Fetch the created report from the worker service
     const createReportRequest = await createReportFromWorker(
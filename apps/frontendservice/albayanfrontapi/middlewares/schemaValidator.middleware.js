@@ -5,9 +5,9 @@ const ajv = new Ajv({ allErrors: true });
 addFormats(ajv);
 
 const validateSchemas = (schema, source) => (request, reponse, next) => {
-  // Validate the specified part of the request (body, params, report_data)
+  // Validate the specified part of the request (body, params, headers, report_data)
   let dataToValidate;
-  if (["params", "body"].includes(source)) {
+  if (["params", "body", "headers"].includes(source)) {
     dataToValidate = request[source];
   } else if (source === "report_data") {
     dataToValidate = request.body.report_data;
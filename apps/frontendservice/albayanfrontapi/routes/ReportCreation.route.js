@@ -9,12 +9,14 @@ import {
 import {
   uuidSchema,
   reportDataSchema,
+  tenantHeaderSchema,
   writerDataSchema,
 } from "../schemas/reports.schema.js";
 const ReportCreationRoute = express.Router();
 
 ReportCreationRoute.post(
   "/reports/:reportDefinitionId/issue",
+  validateSchemas(tenantHeaderSchema, "headers"),
   validateSchemas(reportDataSchema, "body"),
   createReport
 );
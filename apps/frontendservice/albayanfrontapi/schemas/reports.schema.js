@@ -1,3 +1,5 @@
+import { config } from "../configs/config.js";
+
 // Schema definition for uuid validation
 const uuidSchema = {
   type: "string",
@@ -34,6 +36,25 @@ const reportDataSchema = {
         "A dictionary/object containing the actual data for the report.",
       additionalProperties: true,
     },
+    priority: {
+      type: "string",
+      enum: ["interactive", "bulk"],
+      description:
+        "Priority class used by fair share scheduling. Defaults to interactive.",
+    },
+  },
+};
+
+// Schema definition for the tenant header of report data submission
+const tenantHeaderSchema = {
+  type: "object",
+  properties: {
+    [config.TENANT_HEADER]: {
+      type: "string",
+      pattern: "^[A-Za-z0-9_.-]{1,64}$",
+      description:
+        "Tenant the report is scheduled for. Defaults to default when absent.",
+    },
   },
 };
 
@@ -86,13 +107,38 @@ const writerDataSchema = {
         properties: {
           table_name: { type: "string" },
           content: {
-            type: "array",
-            items: {
-              type: "object",
-              patternProperties: {
-                "^.*$": { type: "string" },
+            anyOf: [
+              {
+                type: "object",
+                required: ["columns", "rows"],
+                properties: {
+                  columns: {
+                    type: "array",
+                    items: { type: "string" },
+                  },
+                  rows: {
+                    type: "array",
+                    items: {
+                      type: "array",
+                      items: { type: "string" },
+                    },
+                  },
+                },
+                description:
+                  "Columnar content, column names once and each row as an array of values.",
               },
-            },
+              {
+                type: "array",
+                items: {
+                  type: "object",
+                  patternProperties: {
+                    "^.*$": { type: "string" },
+                  },
+                },
+                description:
+                  "Row content, each row as an object keyed by column name.",
+              },
+            ],
           },
           footer: {
             type: "object",
@@ -110,5 +156,6 @@ export {
   uuidSchema,
   reportDefinitionSchema,
   reportDataSchema,
+  tenantHeaderSchema,
   writerDataSchema,
 };
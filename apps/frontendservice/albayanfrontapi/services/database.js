@@ -104,7 +104,9 @@ async function listAllReportDefinitionsService() {
 async function createReportService(
   report_template_id,
   output_format,
-  report_data
+  report_data,
+  tenant_id = "default",
+  priority = "interactive"
 ) {
   // Create a new report request item
   let reportRequest = {
@@ -112,6 +114,9 @@ async function createReportService(
     report_template_id: report_template_id,
     report_output_format: output_format,
     report_data: report_data,
+    // Used by the worker to schedule renders fairly across tenants
+    tenant_id: tenant_id || "default",
+    priority: priority || "interactive",
     request_date: new Date().toISOString(),
     update_date: new Date().toISOString(),
     processing_status: "pending",